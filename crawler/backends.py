@@ -0,0 +1,382 @@
+"""
+Object stores behind Storage.
+
+    s3                 the S3 / R2 bucket from the S3_* settings (default)
+    local:<dir>        a directory in the static JSON layout (data/daily/..., data/projects/...)
+    sqlite:<path>      one SQLite file; project records are also indexed into repos, tags
+                       and star_points tables for queries such as SQLiteBackend.top_growth
+
+Every backend stores raw bodies under string keys and implements get, head, put and
+list_keys; Storage adds the JSON encoding, content hashes and the upload manifest.
+get and head return None for missing keys; other failures raise one of BACKEND_ERRORS.
+"""
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import boto3
+from botocore.config import Config as BotoConfig
+from botocore.exceptions import ClientError
+from . import history as star_history
+from .config import Config
+
+BACKEND_ERRORS = (ClientError, OSError, sqlite3.Error)
+# Keys listed per request (S3's maximum)
+LIST_PAGE_SIZE = 1000
+
+_PROJECT_KEY = re.compile(r"^data/projects/([^/]+)/([^/]+)\.json$")
+
+
+def _etag(body):
+    return f'"{hashlib.md5(body).hexdigest()}"'
+
+
+def open_backend(spec=None):
+    """Backend for a spec such as 's3', 'local:public/data-root' or 'sqlite:.cache/crawler.db'."""
+    spec = spec or Config.STORAGE_BACKEND
+    kind, _, location = spec.partition(":")
+    if kind == "s3":
+        return S3Backend(location or None)
+    if kind == "local" and location:
+        return LocalBackend(location)
+    if kind == "sqlite" and location:
+        return SQLiteBackend(location)
+    raise ValueError(f"Unknown storage backend {spec!r} (expected s3, local:<dir> or sqlite:<path>)")
+
+
+class S3Backend:
+    """The S3 / R2 bucket (S3_BUCKET_NAME unless given)."""
+
+    def __init__(self, bucket=None):
+        self.s3 = boto3.client(
+            's3',
+            endpoint_url=Config.S3_ENDPOINT_URL,
+            aws_access_key_id=Config.S3_ACCESS_KEY_ID,
+            aws_secret_access_key=Config.S3_SECRET_ACCESS_KEY,
+            region_name=Config.S3_REGION_NAME,
+            # One pooled connection per bulk worker
+            config=BotoConfig(max_pool_connections=max(10, Config.S3_CONCURRENCY))
+        )
+        self.bucket = bucket or Config.S3_BUCKET_NAME
+        # Kept as the manifest's "bucket" so existing manifests stay valid
+        self.location = self.bucket
+
+    def get(self, key):
+        try:
+            response = self.s3.get_object(Bucket=self.bucket, Key=key)
+            body = response['Body'].read()
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'NoSuchKey':
+                return None
+            raise
+        return {
+            "body": body,
+            "content_type": response.get('ContentType'),
+            "content_encoding": response.get('ContentEncoding'),
+            "cache_control": response.get('CacheControl'),
+            "metadata": response.get('Metadata', {}),
+            "etag": response.get('ETag'),
+        }
+
+    def head(self, key):
+        try:
+            response = self.s3.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+        return {"metadata": response.get('Metadata', {}), "etag": response.get('ETag')}
+
+    def put(self, key, body, content_type, cache_control=None, metadata=None, content_encoding=None):
+        """Writes the object; returns its ETag."""
+        extra_args = {"ContentEncoding": content_encoding} if content_encoding else {}
+        if cache_control:
+            extra_args["CacheControl"] = cache_control
+        response = self.s3.put_object(
+            Bucket=self.bucket,
+            Key=key,
+            Body=body,
+            ContentType=content_type,
+            Metadata=metadata or {},
+            **extra_args
+        )
+        return response.get('ETag')
+
+    def list_keys(self, prefix):
+        """Yields every key under prefix, one list request per LIST_PAGE_SIZE keys."""
+        paginator = self.s3.get_paginator('list_objects_v2')
+        for page in paginator.paginate(
+            Bucket=self.bucket, Prefix=prefix, PaginationConfig={"PageSize": LIST_PAGE_SIZE}
+        ):
+            for obj in page.get('Contents', []):
+                yield obj['Key']
+
+
+class LocalBackend:
+    """
+    A directory laid out like the bucket, which any static file server can serve.
+    Bodies are stored decoded (gzip-encoded uploads are decompressed), and the headers
+    and metadata of each object are kept in a sidecar file under <dir>/.meta/.
+    """
+
+    META_DIR = ".meta"
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.location = f"local:{self.root}"
+
+    def _path(self, key, meta=False):
+        parts = key.split("/")
+        if not key or any(part in ("", ".", "..") for part in parts) or parts[0] == self.META_DIR:
+            raise ValueError(f"Invalid key {key!r}")
+        if meta:
+            return os.path.join(self.root, self.META_DIR, *parts) + ".json"
+        return os.path.join(self.root, *parts)
+
+    @staticmethod
+    def _write(path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _meta(self, key):
+        try:
+            with open(self._path(key, meta=True), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        meta = self._meta(key)
+        return {
+            "body": body,
+            "content_type": meta.get("content_type"),
+            "content_encoding": None,
+            "cache_control": meta.get("cache_control"),
+            "metadata": meta.get("metadata", {}),
+            "etag": meta.get("etag") or _etag(body),
+        }
+
+    def head(self, key):
+        if not os.path.isfile(self._path(key)):
+            return None
+        meta = self._meta(key)
+        return {"metadata": meta.get("metadata", {}), "etag": meta.get("etag")}
+
+    def put(self, key, body, content_type, cache_control=None, metadata=None, content_encoding=None):
+        if content_encoding == "gzip":
+            body = gzip.decompress(body)
+        etag = _etag(body)
+        meta = {"content_type": content_type, "cache_control": cache_control, "metadata": metadata or {}, "etag": etag}
+        # Sidecar first: a crash in between leaves stale metadata, never an object without any
+        self._write(self._path(key, meta=True), json.dumps(meta).encode('utf-8'))
+        self._write(self._path(key), body)
+        return etag
+
+    def list_keys(self, prefix):
+        """Yields every key under prefix, in key order."""
+        directory, _, _ = prefix.rpartition("/")
+        start = os.path.join(self.root, *directory.split("/")) if directory else self.root
+        for dirpath, dirnames, filenames in os.walk(start):
+            if dirpath == self.root:
+                dirnames[:] = [name for name in dirnames if name != self.META_DIR]
+            dirnames.sort()
+            relative = os.path.relpath(dirpath, self.root).replace(os.sep, "/")
+            for name in sorted(filenames):
+                if name.endswith(".tmp"):
+                    continue
+                key = name if relative == "." else f"{relative}/{name}"
+                if key.startswith(prefix):
+                    yield key
+
+
+class SQLiteBackend:
+    """
+    All objects in one SQLite file. Project records (data/projects/<owner>/<repo>.json)
+    are also indexed on write into:
+
+        repos(full_name, owner, repo, description, language, stars, forks, updated_at)
+        tags(tag, full_name)
+        star_points(full_name, date, stars)
+
+    so history queries run locally without reading every project object.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS objects (
+            key TEXT PRIMARY KEY,
+            body BLOB NOT NULL,
+            content_type TEXT,
+            content_encoding TEXT,
+            cache_control TEXT,
+            metadata TEXT,
+            etag TEXT
+        );
+        CREATE TABLE IF NOT EXISTS repos (
+            full_name TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            repo TEXT NOT NULL,
+            description TEXT,
+            language TEXT,
+            stars INTEGER,
+            forks INTEGER,
+            updated_at TEXT
+        );
+        CREATE TABLE IF NOT EXISTS tags (
+            tag TEXT NOT NULL,
+            full_name TEXT NOT NULL,
+            PRIMARY KEY (tag, full_name)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS tags_by_repo ON tags (full_name);
+        CREATE TABLE IF NOT EXISTS star_points (
+            full_name TEXT NOT NULL,
+            date TEXT NOT NULL,
+            stars INTEGER NOT NULL,
+            PRIMARY KEY (full_name, date)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS star_points_by_date ON star_points (date);
+    """
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self.location = f"sqlite:{self.path}"
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # One connection shared by the bulk workers; writes are serialized anyway
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.executescript(self.SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self.db.close()
+
+    def get(self, key):
+        with self._lock:
+            row = self.db.execute(
+                "SELECT body, content_type, content_encoding, cache_control, metadata, etag FROM objects WHERE key = ?",
+                (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        body, content_type, content_encoding, cache_control, metadata, etag = row
+        return {
+            "body": bytes(body),
+            "content_type": content_type,
+            "content_encoding": content_encoding,
+            "cache_control": cache_control,
+            "metadata": json.loads(metadata or "{}"),
+            "etag": etag,
+        }
+
+    def head(self, key):
+        with self._lock:
+            row = self.db.execute("SELECT metadata, etag FROM objects WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return {"metadata": json.loads(row[0] or "{}"), "etag": row[1]}
+
+    def put(self, key, body, content_type, cache_control=None, metadata=None, content_encoding=None):
+        etag = _etag(body)
+        match = _PROJECT_KEY.match(key)
+        record = None
+        if match:
+            raw = gzip.decompress(body) if content_encoding == "gzip" else body
+            record = json.loads(raw.decode('utf-8'))
+        with self._lock, self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, body, content_type, content_encoding, cache_control, json.dumps(metadata or {}), etag)
+            )
+            if record is not None:
+                self._index_project(match.group(1), match.group(2), record)
+        return etag
+
+    def _index_project(self, owner, repo_name, record):
+        """Replaces the repo's rows in repos, tags and star_points (caller holds the transaction)."""
+        full_name = f"{owner}/{repo_name}"
+        self.db.execute(
+            "INSERT OR REPLACE INTO repos VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                full_name, owner, repo_name,
+                record.get('description'), record.get('language'),
+                record.get('stargazers_count'), record.get('forks_count'),
+                record.get('updated_at')
+            )
+        )
+        self.db.execute("DELETE FROM tags WHERE full_name = ?", (full_name,))
+        self.db.executemany(
+            "INSERT OR IGNORE INTO tags VALUES (?, ?)",
+            ((tag, full_name) for tag in record.get('tags') or [])
+        )
+        self.db.execute("DELETE FROM star_points WHERE full_name = ?", (full_name,))
+        self.db.executemany(
+            "INSERT OR REPLACE INTO star_points VALUES (?, ?, ?)",
+            ((full_name, point["date"][:10], point["count"]) for point in star_history.expand(record.get('star_history')))
+        )
+
+    def list_keys(self, prefix):
+        """Yields every key under prefix in key order, LIST_PAGE_SIZE keys per query."""
+        after = None
+        while True:
+            with self._lock:
+                if after is None:
+                    rows = self.db.execute(
+                        "SELECT key FROM objects WHERE key >= ? ORDER BY key LIMIT ?", (prefix, LIST_PAGE_SIZE)
+                    ).fetchall()
+                else:
+                    rows = self.db.execute(
+                        "SELECT key FROM objects WHERE key > ? ORDER BY key LIMIT ?", (after, LIST_PAGE_SIZE)
+                    ).fetchall()
+            for (key,) in rows:
+                if not key.startswith(prefix):
+                    return
+                yield key
+            if len(rows) < LIST_PAGE_SIZE:
+                return
+            after = rows[-1][0]
+
+    def top_growth(self, tag=None, days=30, limit=20, end_date=None):
+        """
+        Repos (optionally only those tagged `tag`) ranked by stars gained over the `days`
+        days up to end_date (default today), from the indexed star history. The baseline
+        is the last point on or before the window start, or the first point inside it.
+        """
+        end = end_date or datetime.date.today().isoformat()
+        start = (datetime.date.fromisoformat(end) - datetime.timedelta(days=days)).isoformat()
+        tag_join = "JOIN tags t ON t.full_name = r.full_name AND t.tag = :tag" if tag else ""
+        query = f"""
+            SELECT full_name, owner, repo, description, language, end_stars, end_stars - start_stars AS growth
+            FROM (
+                SELECT r.full_name, r.owner, r.repo, r.description, r.language,
+                    (SELECT stars FROM star_points p WHERE p.full_name = r.full_name AND p.date <= :end
+                        ORDER BY p.date DESC LIMIT 1) AS end_stars,
+                    COALESCE(
+                        (SELECT stars FROM star_points p WHERE p.full_name = r.full_name AND p.date <= :start
+                            ORDER BY p.date DESC LIMIT 1),
+                        (SELECT stars FROM star_points p WHERE p.full_name = r.full_name AND p.date > :start
+                            ORDER BY p.date LIMIT 1)
+                    ) AS start_stars
+                FROM repos r {tag_join}
+            )
+            WHERE end_stars IS NOT NULL AND start_stars IS NOT NULL
+            ORDER BY growth DESC, end_stars DESC, full_name
+            LIMIT :limit
+        """
+        columns = ("full_name", "owner", "repo", "description", "language", "stars", "growth")
+        with self._lock:
+            rows = self.db.execute(query, {"tag": tag, "start": start, "end": end, "limit": limit}).fetchall()
+        return [dict(zip(columns, row)) for row in rows]
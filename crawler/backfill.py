@@ -0,0 +1,271 @@
+"""
+Backfills trending history from archived trending pages.
+
+    python -m crawler.backfill DIR [--since YYYY-MM-DD] [--until YYYY-MM-DD] [--workers N]
+                                   [--batch-days N] [--force]
+
+DIR holds saved GitHub trending pages (.html or .html.gz, e.g. a web-archive dump) in any
+layout; each file's capture date is the first YYYY-MM-DD or YYYYMMDD in its path, and its
+range the daily/weekly/monthly in the path (default daily). When a page was captured
+several times on one date, the last file in path order wins.
+
+Pages are parsed in a process pool, BACKFILL_BATCH_DAYS dates at a time, so only one
+batch of rows is in memory. Every date gets its daily file and rollups; every repo seen
+in the batch gets its star counts merged into its project record and chart history in a
+single write. Dates that already have a daily file (from a live crawl) are left alone
+unless --force is given. Repos without a record get a stub marked "backfilled", which the
+next live crawl replaces with full GitHub details, keeping the backfilled points.
+"""
+import argparse
+import datetime
+import gzip
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+from . import history as star_history
+from .config import Config
+from .index import ShardedIndex
+from .main import project_key
+from .metrics import metrics, runs_key
+from .publish import publish_changes
+from .refresh import last_updated
+from .rollups import daily_key, update_rollups
+from .storage import Storage
+from .trending import RANGE_DAYS, growth_per_day, merge_trending, parse_trending_html
+
+_DATE = re.compile(r"(?<!\d)(20\d\d)-?([01]\d)-?([0-3]\d)")
+_RANGE = re.compile(r"(?<![a-z])(daily|weekly|monthly)(?![a-z])")
+# Language pages: .../trending/<language>
+_LANGUAGE = re.compile(r"trending/([^/?#&=.]+)")
+
+
+def page_of(relative_path):
+    """(date, range, language) of an archived page, from its path; None without a date."""
+    date = None
+    for match in _DATE.finditer(relative_path):
+        try:
+            date = datetime.date(*map(int, match.groups())).isoformat()
+            break
+        except ValueError:
+            continue
+    if date is None:
+        return None
+    time_range = _RANGE.search(relative_path.lower())
+    language = _LANGUAGE.search(relative_path)
+    language = language.group(1) if language and language.group(1) not in RANGE_DAYS else ""
+    return date, time_range.group(1) if time_range else "daily", language
+
+
+def find_pages(directory, since=None, until=None):
+    """Sorted (date, range, language, path) of every archived page, one per page and date."""
+    pages = {}
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames.sort()
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            relative_path = os.path.relpath(path, directory).replace(os.sep, "/")
+            # Archive dumps often keep the URL as the file name, without an extension
+            if not name.endswith((".html", ".htm", ".html.gz", ".htm.gz")) and "trending" not in relative_path:
+                continue
+            page = page_of(relative_path)
+            if page is None:
+                print(f"Skipping {path}: no capture date in its path")
+                continue
+            if (since and page[0] < since) or (until and page[0] > until):
+                continue
+            # Later captures of the same page and date replace earlier ones
+            pages[page] = path
+    return sorted((*page, path) for page, path in pages.items())
+
+
+def parse_page(job):
+    """Process-pool worker: (path, time_range) -> (path, rows, error)."""
+    path, time_range = job
+    try:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, 'rb') as f:
+            html = f.read()
+        return path, parse_trending_html(html, time_range), None
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+
+def snapshot_entry(row):
+    """Daily-file entry for a merged trending row (the format main.process_repo writes)."""
+    return {
+        "owner": row['owner'],
+        "repo": row['repo'],
+        "description": row.get('description'),
+        "language": None if row.get('language') == "Unknown" else row.get('language'),
+        "stars": row['stars'],
+        "forks": row['forks'],
+        "growth": row['growth'],
+        "ranges": row['ranges'],
+        "growth_by_range": row['growth_by_range'],
+        "tags": []
+    }
+
+
+def stub_record(entry):
+    """Project record for a repo only known from archived pages."""
+    return {
+        "owner": entry['owner'],
+        "repo": entry['repo'],
+        "full_name": f"{entry['owner']}/{entry['repo']}",
+        "description": entry['description'],
+        "html_url": f"https://github.com/{entry['owner']}/{entry['repo']}",
+        "language": entry['language'],
+        "stargazers_count": entry['stars'],
+        "forks_count": entry['forks'],
+        "tags": [],
+        "backfilled": True
+    }
+
+
+def update_records(storage, entries, points):
+    """
+    Merges a batch's star counts into the project records and chart histories, writing
+    each touched repo once. entries: full_name -> latest daily entry in the batch;
+    points: full_name -> [{"date", "count"}]. Returns the number of repos written.
+    """
+    def modify(record, full_name):
+        entry = entries[full_name]
+        record = record or stub_record(entry)
+        history = star_history.merge(record.get('star_history'), points[full_name])
+        if record.get('backfilled'):
+            # Stubs follow the newest archived page; live records keep their GitHub data
+            record.update(stub_record(entry), stargazers_count=history[-1]["count"])
+        return record, history
+
+    return storage.update_projects({
+        project_key(*full_name.split('/')): (*full_name.split('/'), full_name)
+        for full_name in entries
+    }, modify)
+
+def backfill_batch(storage, executor, pages, force=False):
+    """
+    Parses one batch of pages and writes its daily files, rollups, records and histories.
+    Returns {full_name: index entry} for the repos seen, from their latest date.
+    """
+    dates = sorted({page[0] for page in pages})
+    if not force:
+        existing = {date for date in dates if storage.exists(daily_key(date))}
+        if existing:
+            print(f"Keeping {len(existing)} dates that already have daily files.")
+        pages = [page for page in pages if page[0] not in existing]
+    if not pages:
+        return {}
+
+    with metrics.span("backfill.parse"):
+        parsed = {}
+        for path, rows, error in executor.map(parse_page, [(page[3], page[1]) for page in pages], chunksize=8):
+            if error:
+                print(f"Error parsing {path}: {error}")
+            elif not rows:
+                print(f"No trending repos in {path}")
+            parsed[path] = rows or []
+    metrics.count("backfill.pages", len(pages))
+
+    entries = {}
+    points = {}
+    for date, date_pages in groupby(pages, key=lambda page: page[0]):
+        # Overall pages first (daily, weekly, monthly), then language pages, as in a live crawl
+        date_pages = sorted(date_pages, key=lambda page: (page[2], list(RANGE_DAYS).index(page[1])))
+        merged = merge_trending((page[1], parsed[page[3]]) for page in date_pages)
+        if not merged:
+            continue
+        snapshot = [snapshot_entry(row) for row in merged]
+        with metrics.span("backfill.daily"):
+            storage.upload_json(daily_key(date), snapshot)
+            update_rollups(storage, date, snapshot)
+        for entry in snapshot:
+            full_name = f"{entry['owner']}/{entry['repo']}"
+            entries[full_name] = dict(entry, last_seen=date)
+            points.setdefault(full_name, []).append({"date": date, "count": entry['stars']})
+        metrics.count("backfill.dates")
+        print(f"{date}: {len(snapshot)} repos from {len(date_pages)} pages")
+
+    with metrics.span("backfill.records"):
+        written = update_records(storage, entries, points)
+    metrics.count("backfill.records", written)
+    print(f"Updated {written} project records.")
+    return {
+        full_name: {
+            "owner": entry['owner'],
+            "repo": entry['repo'],
+            "description": entry['description'],
+            "stars": entry['stars'],
+            "tags": entry['tags'],
+            "language": entry['language'],
+            "growth_per_day": growth_per_day(entry['growth_by_range']),
+            "last_seen": entry['last_seen']
+        }
+        for full_name, entry in entries.items()
+    }
+
+
+def update_index(storage, seen, today_str):
+    """
+    Adds index entries for backfilled repos the index lacks. Existing entries only take
+    the archive's figures when its date is newer than their last trending appearance
+    and refresh; they keep their tags and other fields either way.
+    """
+    index = ShardedIndex(storage)
+    current = {f"{entry['owner']}/{entry['repo']}": entry for entry in index.load_all()}
+    updates = []
+    for full_name, entry in seen.items():
+        existing = current.get(full_name)
+        if existing is None:
+            updates.append(entry)
+        elif (last_updated(existing) or "") < entry['last_seen']:
+            updates.append({**existing, **entry, 'tags': existing.get('tags') or entry['tags']})
+    if updates:
+        changed_shards = index.update(updates, updated=today_str)
+        print(f"Added or updated {len(updates)} repos in {len(changed_shards)} index shards.")
+
+
+def main(directory, storage=None, since=None, until=None, workers=None, batch_days=None, force=False):
+    print(f"Backfilling trending history from {directory}...")
+    metrics.reset()
+    storage = storage or Storage()
+    today_str = datetime.datetime.now().strftime('%Y-%m-%d')
+    batch_days = batch_days or Config.BACKFILL_BATCH_DAYS
+
+    metrics.stage("scan")
+    pages = find_pages(directory, since, until)
+    dates = sorted({page[0] for page in pages})
+    print(f"Found {len(pages)} pages covering {len(dates)} dates.")
+
+    metrics.stage("batches")
+    seen = {}
+    with ProcessPoolExecutor(max_workers=workers or Config.BACKFILL_WORKERS or None) as executor:
+        for start in range(0, len(dates), batch_days):
+            batch_dates = set(dates[start:start + batch_days])
+            print(f"Batch {min(batch_dates)} to {max(batch_dates)}...")
+            seen.update(backfill_batch(storage, executor, [page for page in pages if page[0] in batch_dates], force))
+            storage.save_manifest()
+
+    metrics.stage("index")
+    if seen:
+        update_index(storage, seen, today_str)
+
+    metrics.stage(None)
+    report = metrics.report(date=today_str, directory=directory, pages=len(pages), dates=len(dates), repos=len(seen))
+    storage.upload_json(runs_key(today_str, "backfill"), report)
+    publish_changes(storage, today_str)
+    storage.save_manifest()
+    print("Done!")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("directory", help="directory of archived trending pages")
+    arg_parser.add_argument("--since", help="first capture date to ingest (YYYY-MM-DD)")
+    arg_parser.add_argument("--until", help="last capture date to ingest (YYYY-MM-DD)")
+    arg_parser.add_argument("--workers", type=int, help="parser processes (default BACKFILL_WORKERS, or one per CPU)")
+    arg_parser.add_argument("--batch-days", type=int, help=f"dates per batch (default BACKFILL_BATCH_DAYS, {Config.BACKFILL_BATCH_DAYS})")
+    arg_parser.add_argument("--force", action="store_true", help="also rewrite dates that already have daily files")
+    args = arg_parser.parse_args()
+    main(args.directory, since=args.since, until=args.until, workers=args.workers,
+         batch_days=args.batch_days, force=args.force)
@@ -0,0 +1,95 @@
+"""
+Synthetic fixtures in the shape GitHub serves them, for offline benchmarks.
+"""
+import random
+from html import escape
+
+GROWTH_LABELS = {"daily": "stars today", "weekly": "stars this week", "monthly": "stars this month"}
+LANGUAGES = ["Python", "TypeScript", "Rust", "Go", "C++", "Jupyter Notebook", None]
+
+
+def synthetic_repos(count, seed=0, prefix="repo"):
+    """Deterministic trending rows: owner, repo, description, language, stars, forks, growth."""
+    rng = random.Random(seed)
+    repos = []
+    for i in range(count):
+        stars = rng.randint(50, 60000)
+        repos.append({
+            "owner": f"owner{i % max(1, count // 3)}",
+            "repo": f"{prefix}-{i}",
+            "description": f"An open-source AI agent framework for RAG pipelines #{i} \U0001F680",
+            "language": rng.choice(LANGUAGES),
+            "stars": stars,
+            "forks": stars // rng.randint(5, 20),
+            "growth": rng.randint(10, 3000),
+        })
+    return repos
+
+
+def _article(row, time_range):
+    owner = escape(row["owner"])
+    repo = escape(row["repo"])
+    language = ""
+    if row.get("language"):
+        language = f"""
+      <span class="d-inline-block ml-0 mr-3">
+        <span class="repo-language-color" style="background-color: #3572A5"></span>
+        <span itemprop="programmingLanguage">{escape(row["language"])}</span>
+      </span>"""
+    return f"""
+<article class="Box-row">
+  <div class="float-right d-flex">
+    <a class="btn btn-sm" href="/login?return_to=%2F{owner}%2F{repo}">Star</a>
+  </div>
+  <h2 class="h3 lh-condensed">
+    <a data-view-component="true" href="/{owner}/{repo}" class="Link">
+      <svg aria-hidden="true" height="16" viewBox="0 0 16 16" width="16" class="octicon octicon-repo mr-1 color-fg-muted"><path d="M2 2.5A2.5"></path></svg>
+      <span data-view-component="true" class="text-normal">
+        {owner} /
+</span>
+      {repo}
+</a>  </h2>
+  <p class="col-9 color-fg-muted my-1 pr-4">
+        {escape(row["description"])}
+      </p>
+  <div class="f6 color-fg-muted mt-2">{language}
+        <a href="/{owner}/{repo}/stargazers" class="Link Link--muted d-inline-block mr-3">
+          <svg aria-label="star" role="img" height="16" viewBox="0 0 16 16" width="16" class="octicon octicon-star"><path d="M8 .25a.75"></path></svg>
+          {row["stars"]:,}
+</a>
+        <a href="/{owner}/{repo}/forks" class="Link Link--muted d-inline-block mr-3">
+          <svg aria-label="fork" role="img" height="16" viewBox="0 0 16 16" width="16" class="octicon octicon-repo-forked"><path d="M5 5.372v.878"></path></svg>
+          {row["forks"]:,}
+</a>
+        <span class="d-inline-block mr-3">
+          Built by
+          <a class="d-inline-block" href="/{owner}"><img class="avatar mb-1 avatar-user" src="https://avatars.githubusercontent.com/u/1?s=40&amp;v=4" width="20" height="20" alt="@{owner}" /></a>
+        </span>
+        <span class="d-inline-block float-sm-right">
+          <svg aria-hidden="true" height="16" viewBox="0 0 16 16" width="16" class="octicon octicon-star"><path d="M8 .25a.75"></path></svg>
+          {row["growth"]:,} {GROWTH_LABELS.get(time_range, "stars today")}
+        </span>
+  </div>
+</article>"""
+
+
+def render_trending_html(rows, time_range="daily"):
+    """A trending page listing rows, with page chrome around the Box-row articles."""
+    articles = "".join(_article(row, time_range) for row in rows)
+    chrome = "\n".join(f'<li class="nav-item"><a href="/topics/t{i}">Topic {i}</a></li>' for i in range(300))
+    return f"""<!DOCTYPE html>
+<html lang="en" data-color-mode="auto">
+<head><meta charset="utf-8"><title>Trending repositories on GitHub</title></head>
+<body class="logged-out env-production page-responsive">
+<header class="HeaderMktg"><nav><ul>{chrome}</ul></nav></header>
+<main>
+<div class="Box">
+  <div class="Box-header d-md-flex flex-items-center flex-justify-between"></div>
+  <div data-hpc>{articles}
+  </div>
+</div>
+</main>
+<footer class="footer">{chrome}</footer>
+</body>
+</html>
+"""
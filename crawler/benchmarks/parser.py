@@ -0,0 +1,95 @@
+"""
+Micro-benchmark for the trending page parsers.
+
+    python -m crawler.benchmarks.parser [page.html ...] [--iterations N]
+    python -m crawler.benchmarks.parser --save [DIR]   # snapshot live trending pages as fixtures
+
+Without paths it parses the captured pages in crawler/benchmarks/pages
+(trending-daily.html, trending-weekly.html, trending-monthly.html, written by --save),
+and falls back to synthetic pages (25 repos, GitHub's markup) for each range only when
+none have been captured. Every backend must return identical rows for every fixture.
+"""
+import argparse
+import os
+import time
+import requests
+from ..trending import PARSERS
+from .fixtures import render_trending_html, synthetic_repos
+
+RANGES = ("daily", "weekly", "monthly")
+PAGES_DIR = os.path.join(os.path.dirname(__file__), "pages")
+
+
+def captured_pages():
+    paths = [os.path.join(PAGES_DIR, f"trending-{time_range}.html") for time_range in RANGES]
+    return [path for path in paths if os.path.exists(path)]
+
+
+def load_fixtures(paths):
+    paths = paths or captured_pages()
+    if not paths:
+        print(f"No captured pages in {PAGES_DIR} (run with --save); using synthetic pages.")
+        return [
+            (f"synthetic-{time_range}", render_trending_html(synthetic_repos(25, seed=i), time_range), time_range)
+            for i, time_range in enumerate(RANGES)
+        ]
+    fixtures = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            html = f.read()
+        # Saved pages are named like trending-weekly.html
+        time_range = next((r for r in RANGES if r in os.path.basename(path)), "daily")
+        fixtures.append((os.path.basename(path), html, time_range))
+    return fixtures
+
+
+def save_fixtures(directory):
+    os.makedirs(directory, exist_ok=True)
+    for time_range in RANGES:
+        response = requests.get(f"https://github.com/trending?since={time_range}", timeout=30)
+        response.raise_for_status()
+        path = os.path.join(directory, f"trending-{time_range}.html")
+        with open(path, 'wb') as f:
+            f.write(response.content)
+        print(f"Saved {path}")
+
+
+def run(fixtures, iterations):
+    results = {}
+    for name, parse in PARSERS.items():
+        outputs = [parse(html, time_range) for _, html, time_range in fixtures]
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for _, html, time_range in fixtures:
+                parse(html, time_range)
+        elapsed = time.perf_counter() - start
+        results[name] = (elapsed / (iterations * len(fixtures)), outputs)
+
+    reference_name, (_, reference) = next(iter(results.items()))
+    for name, (_, outputs) in results.items():
+        if outputs != reference:
+            raise SystemExit(f"Parser {name} disagrees with {reference_name}")
+
+    rows = sum(len(rows) for rows in reference)
+    print(f"{len(fixtures)} fixtures, {rows} repos, {iterations} iterations")
+    baseline = results["html.parser"][0]
+    for name, (per_page, _) in sorted(results.items(), key=lambda item: item[1][0]):
+        print(f"  {name:<12} {per_page * 1000:8.2f} ms/page  {baseline / per_page:5.1f}x")
+    return results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("paths", nargs="*", help="saved trending HTML pages")
+    arg_parser.add_argument("--iterations", type=int, default=20)
+    arg_parser.add_argument("--save", metavar="DIR", nargs="?", const=PAGES_DIR,
+                            help="download live trending pages into DIR (default the captured pages) and exit")
+    args = arg_parser.parse_args()
+    if args.save:
+        save_fixtures(args.save)
+        return
+    run(load_fixtures(args.paths), args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+End-to-end benchmark of the crawler pipeline (crawler.main) against offline stand-ins.
+
+    python -m crawler.benchmarks.pipeline [--trending N] [--known M] [--large K] [--days D]
+        [--github-latency MS] [--llm-latency MS] [--s3-latency MS] [--json PATH]
+
+GitHub trending pages, REST and GraphQL and the Gemini API are served by
+crawler.benchmarks.standins from a synthetic world of N trending repos, M of them
+already stored and K with more than 2000 stars. S3 is moto's in-process mock
+(pip install moto), or a MinIO-style server given with --s3-endpoint.
+
+Every simulated day is one full crawl; the first runs with cold local caches, later
+ones reuse them, as a scheduled crawler would. For each day the benchmark reports wall
+time, requests per endpoint, bytes uploaded and peak traced memory. --json saves the
+numbers so runs can be compared for regressions.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from botocore.exceptions import ClientError
+from ..config import Config
+from ..github_client import GitHubClient
+from ..llm import LLMClient
+from ..main import main as crawl, project_key
+from ..metrics import metrics
+from ..storage import Storage
+from .standins import FakeGemini, FakeGitHub, SyntheticWorld
+
+
+@contextlib.contextmanager
+def overridden_config(**values):
+    """Temporarily sets Config attributes."""
+    saved = {name: getattr(Config, name) for name in values}
+    for name, value in values.items():
+        setattr(Config, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(Config, name, value)
+
+
+@contextlib.contextmanager
+def s3_backend(endpoint=None):
+    """S3 for the benchmark: the server at endpoint, or moto's in-process mock."""
+    if endpoint:
+        with overridden_config(S3_ENDPOINT_URL=endpoint):
+            yield
+        return
+    try:
+        from moto import mock_aws
+    except ImportError:
+        raise SystemExit("The in-process S3 needs moto (pip install moto); or pass --s3-endpoint.")
+    credentials = dict(
+        S3_ENDPOINT_URL=None,
+        S3_ACCESS_KEY_ID="benchmark",
+        S3_SECRET_ACCESS_KEY="benchmark",
+        S3_REGION_NAME="us-east-1"
+    )
+    with overridden_config(**credentials), mock_aws():
+        yield
+
+
+class S3Meter:
+    """Counts the S3 calls of a boto3 client and the bytes it uploads, adding optional latency."""
+
+    def __init__(self, client, latency=0.0):
+        self.latency = latency
+        self.requests = Counter()
+        self.bytes_uploaded = 0
+        self._lock = threading.Lock()
+        # Called with the API parameters as passed to the client, before serialization
+        client.meta.events.register("provide-client-params.s3", self._on_call)
+
+    def _on_call(self, params, model, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        body = params.get("Body")
+        with self._lock:
+            self.requests[f"S3 {model.name}"] += 1
+            if model.name == "PutObject" and isinstance(body, (bytes, bytearray)):
+                self.bytes_uploaded += len(body)
+
+
+def create_bucket(storage):
+    try:
+        storage.backend.s3.create_bucket(Bucket=storage.backend.bucket)
+    except ClientError as e:
+        if e.response["Error"]["Code"] not in ("BucketAlreadyOwnedByYou", "BucketAlreadyExists"):
+            raise
+
+
+def measure(func, trace_memory=True, verbose=False):
+    """Runs func with its output captured; returns (wall seconds, peak traced bytes or None)."""
+    output = sys.stdout if verbose else io.StringIO()
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            func()
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return elapsed, peak
+
+
+def run(world, days=1, github_latency=0.0, llm_latency=0.0, s3_latency=0.0,
+        s3_endpoint=None, bucket="crawler-benchmark", trace_memory=True, verbose=False):
+    """Crawls the synthetic world for the given number of days; returns one result dict per day."""
+    github = FakeGitHub(world, latency=github_latency)
+    gemini = FakeGemini(latency=llm_latency)
+    results = []
+    with tempfile.TemporaryDirectory() as cache_dir, s3_backend(s3_endpoint), overridden_config(
+        GITHUB_TOKENS=["benchmark-token"],
+        GEMINI_API_KEY="benchmark",
+        STORAGE_BACKEND="s3",
+        S3_BUCKET_NAME=bucket,
+        HTTP_CACHE_DIR=os.path.join(cache_dir, "http"),
+        STORAGE_MANIFEST_PATH=os.path.join(cache_dir, "storage_manifest.json"),
+        TAG_CACHE_PATH=os.path.join(cache_dir, "tags.json"),
+        JOURNAL_DIR=os.path.join(cache_dir, "journal")
+    ):
+        # The known repos were stored by earlier crawls, possibly from another runner
+        seed_storage = Storage()
+        create_bucket(seed_storage)
+        with contextlib.redirect_stdout(io.StringIO()):
+            seed_storage.put_many(
+                (project_key(repo["owner"], repo["repo"]), world.record(repo)) for repo in world.known
+            )
+
+        for day in range(days):
+            github.day = day
+            github.reset_counters()
+            gemini.calls = gemini.prompt_tokens = 0
+
+            storage = Storage()
+            meter = S3Meter(storage.backend.s3, latency=s3_latency)
+            gh_client = GitHubClient()
+            gh_client.session.mount("https://", github)
+            gh_client.trending_session.mount("https://", github)
+            llm_client = LLMClient()
+            llm_client.client = gemini
+
+            date = world.date(day)
+            elapsed, peak = measure(
+                lambda: crawl(storage=storage, gh_client=gh_client, llm_client=llm_client, today_str=date),
+                trace_memory=trace_memory,
+                verbose=verbose
+            )
+            requests = Counter(github.requests)
+            requests.update(meter.requests)
+            requests["LLM generate_content"] = gemini.calls
+            results.append({
+                "date": date,
+                "trending": len(world.trending(day, "daily")),
+                "wall_seconds": round(elapsed, 3),
+                "peak_memory_bytes": peak,
+                "bytes_uploaded": meter.bytes_uploaded,
+                "github_bytes_served": github.bytes_served,
+                "requests": dict(sorted(requests.items())),
+                "not_modified": dict(sorted(github.not_modified.items())),
+                "llm_prompt_tokens": gemini.prompt_tokens,
+                "stages": {
+                    name[len("stage."):]: span["seconds"]
+                    for name, span in metrics.report()["spans"].items() if name.startswith("stage.")
+                },
+            })
+    return results
+
+
+def print_report(results):
+    for result in results:
+        memory = f"{result['peak_memory_bytes'] / 2**20:.1f} MB peak" if result["peak_memory_bytes"] else "memory not traced"
+        print(
+            f"{result['date']}: {result['trending']} trending, {result['wall_seconds']:.2f}s wall, "
+            f"{memory}, {result['bytes_uploaded'] / 2**20:.2f} MB uploaded"
+        )
+        for endpoint, count in result["requests"].items():
+            not_modified = result["not_modified"].get(endpoint)
+            suffix = f"  ({not_modified} not modified)" if not_modified else ""
+            print(f"  {endpoint:<40} {count:6d}{suffix}")
+        print("  " + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in result["stages"].items()))
+        if result["llm_prompt_tokens"]:
+            print(f"  {'LLM prompt tokens (estimated)':<40} {result['llm_prompt_tokens']:6d}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--trending", type=int, default=100, help="trending repos per day (N)")
+    arg_parser.add_argument("--known", type=int, default=30, help="trending repos already stored (M)")
+    arg_parser.add_argument("--large", type=int, default=10, help="repos with more than 2000 stars (K)")
+    arg_parser.add_argument("--days", type=int, default=2, help="consecutive daily crawls to run")
+    arg_parser.add_argument("--churn", type=int, default=10, help="trending repos replaced each day")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--github-latency", type=float, default=50, metavar="MS")
+    arg_parser.add_argument("--llm-latency", type=float, default=1000, metavar="MS")
+    arg_parser.add_argument("--s3-latency", type=float, default=20, metavar="MS")
+    arg_parser.add_argument("--s3-endpoint", help="MinIO-style S3 endpoint instead of moto")
+    arg_parser.add_argument("--bucket", default="crawler-benchmark")
+    arg_parser.add_argument("--no-tracemalloc", action="store_true", help="skip memory tracing (faster)")
+    arg_parser.add_argument("--verbose", action="store_true", help="show the crawler's output")
+    arg_parser.add_argument("--json", metavar="PATH", help="save the results as JSON")
+    args = arg_parser.parse_args()
+
+    world = SyntheticWorld(
+        trending=args.trending,
+        known=args.known,
+        large=args.large,
+        churn=args.churn,
+        days=args.days,
+        seed=args.seed
+    )
+    results = run(
+        world,
+        days=args.days,
+        github_latency=args.github_latency / 1000,
+        llm_latency=args.llm_latency / 1000,
+        s3_latency=args.s3_latency / 1000,
+        s3_endpoint=args.s3_endpoint,
+        bucket=args.bucket,
+        trace_memory=not args.no_tracemalloc,
+        verbose=args.verbose
+    )
+    print_report(results)
+    if args.json:
+        workload = {name: getattr(args, name) for name in ("trending", "known", "large", "days", "churn", "seed")}
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"workload": workload, "days": results}, f, indent=2)
+        print(f"Saved {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Offline stand-ins for the services the crawler talks to, for the pipeline benchmark.
+
+SyntheticWorld describes the repos (stars, topics, READMEs, trending pages per day);
+FakeGitHub serves it as trending HTML, REST and GraphQL through a requests adapter;
+FakeGemini answers tagging prompts. All of them count what they serve and can add
+a fixed latency per request.
+
+The responses are generated, not recorded: they follow the shape of GitHub's REST,
+GraphQL and trending responses (only the fields the crawler reads) so the world can
+be scaled and replayed over any number of days, with every day dated by the crawl
+date rather than the wall clock. They measure request counts and pipeline overhead,
+not GitHub's latency or markup drift; crawler/benchmarks/parser.py covers the markup.
+"""
+import datetime
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+from urllib.parse import parse_qsl, urlparse
+import requests
+from requests.adapters import BaseAdapter
+from ..history import compact
+from ..llm import ALL_TAGS
+from .fixtures import render_trending_html, synthetic_repos
+
+# Topics the local classifier recognises, and ones it does not (those repos go to the LLM)
+AI_TOPICS = [["llm", "rag", "retrieval"], ["ai-agents", "agent", "llm"], ["vector-database", "embeddings"]]
+OTHER_TOPICS = [["python", "cli"], ["typescript", "web"], []]
+
+REST_ENDPOINTS = [
+    (re.compile(r"^/repos/[^/]+/[^/]+/readme$"), "/repos/{owner}/{repo}/readme"),
+    (re.compile(r"^/repos/[^/]+/[^/]+/stargazers$"), "/repos/{owner}/{repo}/stargazers"),
+    (re.compile(r"^/repos/[^/]+/[^/]+$"), "/repos/{owner}/{repo}"),
+]
+GRAPHQL_REPOSITORY = re.compile(r'(r\d+): repository\(owner: ("(?:[^"\\]|\\.)*"), name: ("(?:[^"\\]|\\.)*")\)')
+
+
+class SyntheticWorld:
+    """
+    Deterministic repos for a benchmark: `trending` repos trend every day, `churn` of them
+    are replaced by fresh repos each following day, the first `large` have more than
+    2000 stars, and the last `known` of day 0 already have project records.
+    """
+
+    def __init__(self, trending=100, known=30, large=10, churn=10, days=1, seed=0, start=None):
+        self.trending_count = trending
+        self.churn = churn
+        self.start = start or datetime.date.today()
+        rng = random.Random(seed)
+        pool = synthetic_repos(trending + churn * max(0, days - 1), seed=seed)
+        self.repos = {}
+        for i, row in enumerate(pool):
+            stars = rng.randint(2001, 60000) if i < large else rng.randint(50, 2000)
+            topics = rng.choice(AI_TOPICS if i % 2 == 0 else OTHER_TOPICS)
+            row.update(stars=stars, forks=stars // rng.randint(5, 20))
+            if not i % 2 == 0:
+                # No AI keywords: the local classifier is unsure and the repo goes to the LLM
+                row["description"] = f"A fast toolkit for everyday {' and '.join(topics) or 'developer'} workflows #{i}"
+            self.repos[f"{row['owner']}/{row['repo']}"] = dict(
+                row,
+                created=self.start - datetime.timedelta(days=rng.randint(30, 1500)),
+                topics=topics,
+                readme=f"# {row['repo']}\n\n" + (row["description"] + ". ") * 100,
+            )
+        self.pool = list(self.repos.values())
+        self.known = self.pool[max(0, trending - known):trending] if known else []
+
+    def date(self, day):
+        return (self.start + datetime.timedelta(days=day)).isoformat()
+
+    def trending(self, day, time_range):
+        """Rows of the trending page for a range on the given day."""
+        window = self.pool[day * self.churn:day * self.churn + self.trending_count]
+        if time_range == "weekly":
+            return [dict(row, growth=row["growth"] * 5) for row in window[::2]]
+        if time_range == "monthly":
+            return [dict(row, growth=row["growth"] * 20) for row in window[::3]]
+        return window
+
+    def star_dates(self, full_name, first, last):
+        """starred_at dates of stars first..last (1-based), spread evenly since creation."""
+        repo = self.repos[full_name]
+        span = (self.start - repo["created"]).days
+        return [
+            (repo["created"] + datetime.timedelta(days=k * span // repo["stars"])).isoformat() + "T12:00:00Z"
+            for k in range(first, last + 1)
+        ]
+
+    def record(self, repo):
+        """A stored project record for a known repo, as the crawler writes them."""
+        history = [
+            {"date": repo["created"].isoformat(), "count": 0},
+            {"date": (self.start - datetime.timedelta(days=1)).isoformat(), "count": repo["stars"]},
+        ]
+        return {
+            "owner": repo["owner"],
+            "repo": repo["repo"],
+            "full_name": f"{repo['owner']}/{repo['repo']}",
+            "description": repo["description"],
+            "html_url": f"https://github.com/{repo['owner']}/{repo['repo']}",
+            "created_at": f"{repo['created'].isoformat()}T00:00:00+00:00",
+            "stargazers_count": repo["stars"],
+            "forks_count": repo["forks"],
+            "language": repo["language"],
+            "topics": repo["topics"],
+            "readme": repo["readme"],
+            "tags": ["RAG"],
+            "tags_source": "rules",
+            "star_history": compact(history),
+        }
+
+
+class FakeGitHub(BaseAdapter):
+    """Serves a SyntheticWorld as github.com trending pages and the REST/GraphQL APIs."""
+
+    def __init__(self, world, latency=0.0, rate_limit=5000):
+        super().__init__()
+        self.world = world
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.day = 0
+        self.requests = Counter()
+        self.not_modified = Counter()
+        self.bytes_served = 0
+        self._used = Counter()
+        self._lock = threading.Lock()
+
+    def reset_counters(self):
+        with self._lock:
+            self.requests.clear()
+            self.not_modified.clear()
+            self.bytes_served = 0
+            # Every simulated day starts a fresh rate-limit window
+            self._used.clear()
+
+    def send(self, request, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        url = urlparse(request.url)
+        query = dict(parse_qsl(url.query))
+        if url.netloc == "github.com":
+            endpoint, status, body = "GET /trending", 200, self._trending(query)
+            headers = {"Content-Type": "text/html; charset=utf-8"}
+        elif url.path == "/graphql":
+            endpoint, status, body = "POST /graphql", 200, self._graphql(json.loads(request.body)["query"])
+            headers = self._rate_headers("graphql")
+        else:
+            template = next((name for pattern, name in REST_ENDPOINTS if pattern.match(url.path)), url.path)
+            endpoint = f"GET {template}"
+            status, body = self._rest(template, url.path.split("/")[2:4], query)
+            headers = self._rate_headers("core")
+        if status == 200 and endpoint != "GET /trending":
+            headers["ETag"] = '"%s"' % hashlib.sha1(body).hexdigest()
+            if request.headers.get("If-None-Match") == headers["ETag"]:
+                status, body = 304, b""
+
+        with self._lock:
+            self.requests[endpoint] += 1
+            if status == 304:
+                self.not_modified[endpoint] += 1
+            self.bytes_served += len(body)
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        response.status_code = status
+        response.headers.update(headers)
+        response._content = body
+        return response
+
+    def close(self):
+        pass
+
+    def _rate_headers(self, resource):
+        with self._lock:
+            self._used[resource] += 1
+            used = self._used[resource]
+        return {
+            "Content-Type": "application/json; charset=utf-8",
+            "X-RateLimit-Limit": str(self.rate_limit),
+            "X-RateLimit-Remaining": str(max(0, self.rate_limit - used)),
+            "X-RateLimit-Reset": str(int(time.time()) + 3600),
+            "X-RateLimit-Resource": resource,
+        }
+
+    def _trending(self, query):
+        time_range = query.get("since", "daily")
+        return render_trending_html(self.world.trending(self.day, time_range), time_range).encode()
+
+    def _rest(self, template, name_parts, query):
+        repo = self.world.repos.get("/".join(name_parts))
+        if repo is None:
+            return 404, b'{"message": "Not Found"}'
+        if template.endswith("/readme"):
+            return 200, repo["readme"].encode()
+        if template.endswith("/stargazers"):
+            per_page = int(query.get("per_page", 30))
+            first = (int(query.get("page", 1)) - 1) * per_page + 1
+            last = min(repo["stars"], first + per_page - 1)
+            stargazers = [
+                {"starred_at": date, "user": {"login": f"user{first + i}", "type": "User"}}
+                for i, date in enumerate(self.world.star_dates(f"{repo['owner']}/{repo['repo']}", first, last))
+            ]
+            return 200, json.dumps(stargazers).encode()
+        return 200, json.dumps({
+            "full_name": f"{repo['owner']}/{repo['repo']}",
+            "description": repo["description"],
+            "html_url": f"https://github.com/{repo['owner']}/{repo['repo']}",
+            "created_at": f"{repo['created'].isoformat()}T00:00:00Z",
+            "updated_at": f"{self.world.date(self.day)}T00:00:00Z",
+            "pushed_at": f"{self.world.date(self.day)}T00:00:00Z",
+            "stargazers_count": repo["stars"],
+            "forks_count": repo["forks"],
+            "language": repo["language"],
+            "topics": repo["topics"],
+        }).encode()
+
+    def _graphql(self, query):
+        data = {}
+        for alias, owner, name in GRAPHQL_REPOSITORY.findall(query):
+            repo = self.world.repos.get(f"{json.loads(owner)}/{json.loads(name)}")
+            if repo is None:
+                data[alias] = None
+                continue
+            data[alias] = {
+                "nameWithOwner": f"{repo['owner']}/{repo['repo']}",
+                "description": repo["description"],
+                "url": f"https://github.com/{repo['owner']}/{repo['repo']}",
+                "createdAt": f"{repo['created'].isoformat()}T00:00:00Z",
+                "updatedAt": f"{self.world.date(self.day)}T00:00:00Z",
+                "pushedAt": f"{self.world.date(self.day)}T00:00:00Z",
+                "stargazerCount": repo["stars"],
+                "forkCount": repo["forks"],
+                "primaryLanguage": {"name": repo["language"]} if repo["language"] else None,
+                "repositoryTopics": {"nodes": [{"topic": {"name": topic}} for topic in repo["topics"]]},
+                "readme0": {"text": repo["readme"]},
+            }
+        return json.dumps({"data": data}).encode()
+
+
+class FakeGemini:
+    """Stands in for genai.Client: answers batch tagging prompts after `latency` seconds."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.models = self
+        self.calls = 0
+        self.prompt_tokens = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, model, contents, config=None):
+        if self.latency:
+            time.sleep(self.latency)
+        ids = [int(i) for i in re.findall(r"^\s*\[(\d+)\]\s*$", contents, re.MULTILINE)]
+        answer = json.dumps([
+            {"id": i, "tags": [ALL_TAGS[int(hashlib.sha1(contents.encode()).hexdigest(), 16) % len(ALL_TAGS)]]}
+            for i in ids
+        ])
+        # Rough token estimate: about four characters per token
+        prompt_tokens, output_tokens = len(contents) // 4, len(answer) // 4
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+        return SimpleNamespace(
+            text=answer,
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=output_tokens,
+                total_token_count=prompt_tokens + output_tokens,
+            ),
+        )
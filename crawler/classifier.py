@@ -0,0 +1,219 @@
+"""
+Local topic/keyword classifier for the tag taxonomy in llm.CATEGORIES.
+
+Each tag has a set of GitHub topics and keywords. A repo's score for a tag combines
+matching topics (strong signal), description keywords and README keywords (weak signal),
+capped at 1.0. Generic topics and keywords ("weak_topics", "weak_keywords": automation,
+monitoring, chat, ...) also occur in plenty of non-AI repos, so a weak topic scores below
+the threshold on its own, and a tag only counts as confident when the repo also shows an
+AI signal: an AI-specific topic or keyword, or an AI marker (llm, machine-learning, ...)
+in its topics or description. Confident repos are tagged locally; the rest go to the LLM.
+"""
+import re
+from .config import Config
+from .llm import ALL_TAGS, readme_snippet
+
+TOPIC_WEIGHT = 0.6
+WEAK_TOPIC_WEIGHT = 0.25
+DESCRIPTION_WEIGHT = 0.35
+README_WEIGHT = 0.1
+
+CATEGORY_RULES = {
+    "Foundation Model": {
+        "topics": ["foundation-model", "foundation-models", "pretrained-models", "large-language-model", "llm-training", "pretraining"],
+        "keywords": ["foundation model", "pretrained model", "pre-training", "model weights", "base model"],
+    },
+    "Inference & Serving": {
+        "topics": ["llm-inference", "inference-engine", "model-serving", "llm-serving", "vllm", "tensorrt", "onnxruntime"],
+        "weak_topics": ["inference", "serving"],
+        "keywords": ["inference engine", "inference server", "model serving", "serving engine", "kv cache", "openai-compatible api"],
+        "weak_keywords": ["throughput"],
+    },
+    "Fine-tuning & Training": {
+        "topics": ["fine-tuning", "finetuning", "peft", "rlhf", "distributed-training", "sft", "dpo"],
+        "weak_topics": ["training", "lora"],
+        "keywords": ["fine-tuning", "finetuning", "fine-tune", "rlhf", "training framework", "distributed training"],
+        "weak_keywords": ["lora"],
+    },
+    "Quantization": {
+        "topics": ["quantization", "gguf", "gptq", "awq", "model-compression"],
+        "weak_topics": ["int8", "int4"],
+        "keywords": ["quantization", "quantized", "gguf", "gptq", "awq"],
+        "weak_keywords": ["4-bit", "8-bit"],
+    },
+    "Agent Framework": {
+        "topics": ["ai-agent", "ai-agents", "llm-agent", "multi-agent", "agent-framework", "autonomous-agents", "agentic-ai"],
+        "weak_topics": ["agent", "agents"],
+        "keywords": ["agent framework", "ai agent", "ai agents", "multi-agent", "autonomous agent", "agentic"],
+        "weak_keywords": [],
+    },
+    "Workflow Orchestration": {
+        "topics": [],
+        "weak_topics": ["workflow", "workflow-automation", "orchestration", "low-code", "no-code", "automation"],
+        "keywords": [],
+        "weak_keywords": ["workflow", "orchestration", "low-code", "no-code", "visual builder"],
+    },
+    "RAG": {
+        "topics": ["rag", "retrieval-augmented-generation", "graphrag"],
+        "weak_topics": ["retrieval", "knowledge-base"],
+        "keywords": ["rag", "retrieval-augmented", "retrieval augmented", "document q&a"],
+        "weak_keywords": ["knowledge base"],
+    },
+    "Vector Database": {
+        "topics": ["vector-database", "vector-search", "vectordb", "embeddings", "similarity-search"],
+        "weak_topics": ["ann"],
+        "keywords": ["vector database", "vector search", "vector store", "similarity search", "embedding search"],
+        "weak_keywords": [],
+    },
+    "Coding Assistant": {
+        "topics": ["coding-assistant", "code-generation", "copilot", "ai-coding", "claude-code", "vibe-coding"],
+        "weak_topics": ["code-completion"],
+        "keywords": ["coding assistant", "code generation", "coding agent", "copilot", "pair programmer"],
+        "weak_keywords": ["code completion"],
+    },
+    "Chatbot": {
+        "topics": ["chatbot", "chatgpt", "conversational-ai"],
+        "weak_topics": ["chat", "chat-ui", "assistant"],
+        "keywords": ["chatbot", "chat assistant"],
+        "weak_keywords": ["chat ui", "chat interface", "conversational"],
+    },
+    "Image & Video Generation": {
+        "topics": ["stable-diffusion", "text-to-image", "image-generation", "video-generation", "text-to-video", "comfyui", "diffusion-models"],
+        "weak_topics": ["diffusion"],
+        "keywords": ["image generation", "video generation", "text-to-image", "text-to-video", "diffusion model", "stable diffusion"],
+        "weak_keywords": [],
+    },
+    "Audio & Speech": {
+        "topics": ["tts", "text-to-speech", "speech-recognition", "asr", "whisper", "voice-cloning"],
+        "weak_topics": ["speech", "voice", "audio"],
+        "keywords": ["text-to-speech", "speech recognition", "speech synthesis", "voice cloning", "tts", "asr"],
+        "weak_keywords": [],
+    },
+    "LLMOps & Evaluation": {
+        "topics": ["llmops", "mlops", "llm-evaluation"],
+        "weak_topics": ["observability", "evaluation", "monitoring", "tracing", "benchmark"],
+        "keywords": ["llmops", "evals"],
+        "weak_keywords": ["observability", "evaluation", "tracing", "monitoring", "benchmark"],
+    },
+    "Security & Safety": {
+        "topics": ["ai-safety", "red-teaming", "jailbreak", "guardrails", "prompt-injection"],
+        "weak_topics": ["security", "safety", "alignment"],
+        "keywords": ["guardrails", "red teaming", "jailbreak", "prompt injection", "ai safety"],
+        "weak_keywords": ["alignment"],
+    },
+    "Data & Datasets": {
+        "topics": ["synthetic-data"],
+        "weak_topics": ["dataset", "datasets", "data-labeling", "annotation", "data-processing", "web-scraping"],
+        "keywords": ["synthetic data"],
+        "weak_keywords": ["dataset", "data labeling", "annotation", "data pipeline", "data cleaning"],
+    },
+}
+
+
+# Topics and description words that mark a repo as AI-related, whatever its category
+AI_MARKER_TOPICS = {
+    "ai", "artificial-intelligence", "llm", "llms", "large-language-models", "machine-learning",
+    "deep-learning", "generative-ai", "genai", "gpt", "openai", "nlp", "neural-network",
+    "neural-networks", "pytorch", "transformers", "langchain", "ollama", "huggingface", "computer-vision",
+}
+_AI_MARKER = re.compile(
+    r"(?<!\w)(ai|llms?|gpt[\w.-]*|genai|chatgpt|openai|ollama|machine learning|deep learning"
+    r"|neural|language models?|generative|hugging ?face)(?!\w)"
+)
+
+
+def _compile(keywords):
+    return [re.compile(r"(?<![\w-])" + re.escape(keyword) + r"(?![\w-])") for keyword in keywords]
+
+
+# Precompiled keyword patterns per tag, as (pattern, AI-specific); only tags of the
+# current taxonomy are kept
+_KEYWORD_PATTERNS = {
+    tag: [(pattern, True) for pattern in _compile(rules["keywords"])]
+    + [(pattern, False) for pattern in _compile(rules.get("weak_keywords", []))]
+    for tag, rules in CATEGORY_RULES.items() if tag in ALL_TAGS
+}
+_TOPIC_INDEX = {}
+for _tag, _rules in CATEGORY_RULES.items():
+    for _topic in _rules["topics"]:
+        _TOPIC_INDEX.setdefault(_topic, []).append((_tag, TOPIC_WEIGHT))
+    for _topic in _rules.get("weak_topics", []):
+        _TOPIC_INDEX.setdefault(_topic, []).append((_tag, WEAK_TOPIC_WEIGHT))
+
+
+def ai_signal(repo_data):
+    """Whether topics or description mark the repo as AI-related (generic terms don't count)."""
+    for topic in repo_data.get('topics') or []:
+        topic = topic.lower()
+        if topic in AI_MARKER_TOPICS or any(weight == TOPIC_WEIGHT for _, weight in _TOPIC_INDEX.get(topic, [])):
+            return True
+    description = (repo_data.get('description') or '').lower()
+    if not description:
+        return False
+    if _AI_MARKER.search(description):
+        return True
+    return any(
+        specific and pattern.search(description)
+        for patterns in _KEYWORD_PATTERNS.values() for pattern, specific in patterns
+    )
+
+
+def score(repo_data):
+    """Per-tag confidence in [0, 1] from topics, description and README keywords."""
+    scores = {}
+    for topic in repo_data.get('topics') or []:
+        for tag, weight in _TOPIC_INDEX.get(topic.lower(), []):
+            scores[tag] = scores.get(tag, 0) + weight
+
+    description = (repo_data.get('description') or '').lower()
+    readme = readme_snippet(repo_data).lower()
+    for tag, patterns in _KEYWORD_PATTERNS.items():
+        for pattern, _ in patterns:
+            if description and pattern.search(description):
+                scores[tag] = scores.get(tag, 0) + DESCRIPTION_WEIGHT
+            if readme and pattern.search(readme):
+                scores[tag] = scores.get(tag, 0) + README_WEIGHT
+    return {tag: round(min(value, 1.0), 3) for tag, value in scores.items() if tag in _KEYWORD_PATTERNS}
+
+
+def classify(repo_data, min_confidence=None):
+    """
+    Returns (tags, confident): the tags scoring at least min_confidence, strongest first,
+    and whether any tag reached it (only possible with an AI signal). Otherwise tags
+    holds the best guesses, or ["Non-AI"] when nothing marks the repo as AI-related.
+    """
+    min_confidence = Config.CLASSIFIER_MIN_CONFIDENCE if min_confidence is None else min_confidence
+    scores = score(repo_data)
+    ranked = sorted(scores, key=lambda tag: (-scores[tag], tag))
+    if not ai_signal(repo_data):
+        return ["Non-AI"], False
+    confident = [tag for tag in ranked if scores[tag] >= min_confidence]
+    if confident:
+        return confident, True
+    return ranked[:2], False
+
+
+def tag_repos(repos, llm_client):
+    """
+    Sets 'tags' and 'tags_source' on each repo dict.
+    tags_source is 'rules' (confident local match), 'llm' (model or its cache) or
+    'rules_fallback' (low-confidence local guess used because the LLM gave nothing).
+    """
+    pending = []
+    for repo_data in repos:
+        tags, confident = classify(repo_data)
+        if confident:
+            repo_data['tags'] = tags
+            repo_data['tags_source'] = "rules"
+        else:
+            repo_data['tags'] = tags
+            repo_data['tags_source'] = "rules_fallback"
+            pending.append(repo_data)
+
+    print(f"Tagged {len(repos) - len(pending)} repos locally; {len(pending)} need the LLM.")
+    if pending and Config.GEMINI_API_KEY:
+        for repo_data, tags in zip(pending, llm_client.generate_tags_batch(pending)):
+            if tags:
+                repo_data['tags'] = tags
+                repo_data['tags_source'] = "llm"
+    return repos
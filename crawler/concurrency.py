@@ -0,0 +1,25 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .config import Config
+
+
+class ConcurrencyLimits:
+    """Per-service caps on in-flight calls, shared by all crawler workers.
+    (LLM requests are batched and capped by LLMClient itself.)"""
+
+    def __init__(self, s3=None, github=None):
+        self.s3 = threading.BoundedSemaphore(s3 or Config.S3_CONCURRENCY)
+        self.github = threading.BoundedSemaphore(github or Config.GITHUB_CONCURRENCY)
+
+
+def run_ordered(func, items, workers=None):
+    """
+    Runs func over items on a thread pool and returns the results in input order.
+    With a single worker the items are processed inline, one after another.
+    """
+    workers = workers or Config.CRAWLER_WORKERS
+    items = list(items)
+    if workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as executor:
+        return list(executor.map(func, items))
@@ -5,6 +5,10 @@ load_dotenv()
 
 class Config:
     GITHUB_TOKEN = os.getenv("GITHUB_TOKEN") or os.getenv("MY_GITHUB_TOKEN")
+    # Extra tokens to rotate across (comma separated); GITHUB_TOKEN is always included
+    GITHUB_TOKENS = list(dict.fromkeys(
+        t.strip() for t in [GITHUB_TOKEN or ""] + os.getenv("GITHUB_TOKENS", "").split(",") if t.strip()
+    ))
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
     
     # S3 / R2 Configuration
@@ -14,5 +18,63 @@ class Config:
     S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME", "ai-trending-data")
     S3_REGION_NAME = os.getenv("S3_REGION_NAME", "auto")
     
+    # Where Storage keeps objects: 's3' (the bucket above), 'local:<dir>' (static JSON layout on
+    # disk) or 'sqlite:<path>' (one database file, with repos/tags/star history indexed for queries)
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "s3")
+    
+    # Stored JSON format: 'pretty' (indented), 'minified' or 'gzip' (minified + Content-Encoding: gzip)
+    JSON_ENCODING = os.getenv("JSON_ENCODING", "minified")
+    # Local hashes/ETags of stored objects, used to skip unchanged uploads without a GET
+    STORAGE_MANIFEST_PATH = os.getenv("STORAGE_MANIFEST_PATH", ".cache/storage_manifest.json")
+    
+    # Number of owner-hashed shards for data/index/ (fixed once published)
+    INDEX_SHARD_COUNT = int(os.getenv("INDEX_SHARD_COUNT", "64"))
+    
+    # Local classifier: repos whose best tag scores at least this skip the LLM
+    CLASSIFIER_MIN_CONFIDENCE = float(os.getenv("CLASSIFIER_MIN_CONFIDENCE", "0.6"))
+    
+    # LLM tagging: repos per request, and the persistent cache of tags by README hash
+    LLM_BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", "10"))
+    TAG_CACHE_PATH = os.getenv("TAG_CACHE_PATH", ".cache/tags.json")
+    
+    # Concurrency (set CRAWLER_WORKERS=1 to process repos sequentially)
+    CRAWLER_WORKERS = int(os.getenv("CRAWLER_WORKERS", "8"))
+    S3_CONCURRENCY = int(os.getenv("S3_CONCURRENCY", "8"))
+    GITHUB_CONCURRENCY = int(os.getenv("GITHUB_CONCURRENCY", "4"))
+    LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "2"))
+    
+    # Trending scrape: ranges and extra language pages (e.g. "python,jupyter-notebook")
+    TRENDING_RANGES = [r for r in os.getenv("TRENDING_RANGES", "daily,weekly,monthly").split(",") if r]
+    TRENDING_LANGUAGES = [l for l in os.getenv("TRENDING_LANGUAGES", "").split(",") if l]
+    TRENDING_CONCURRENCY = int(os.getenv("TRENDING_CONCURRENCY", "6"))
+    
+    # Rate limiting: requests kept in reserve per token, and the fraction of the limit
+    # below which requests are spread out until the reset
+    RATE_LIMIT_RESERVE = int(os.getenv("RATE_LIMIT_RESERVE", "50"))
+    RATE_LIMIT_PACE_BELOW = float(os.getenv("RATE_LIMIT_PACE_BELOW", "0.1"))
+    
+    # Star history: stargazer pages requested per repo (repos needing more are sampled)
+    STAR_HISTORY_MAX_PAGES = int(os.getenv("STAR_HISTORY_MAX_PAGES", "20"))
+    STAR_HISTORY_WORKERS = int(os.getenv("STAR_HISTORY_WORKERS", "4"))
+    
+    # Refresh mode (python -m crawler.refresh): most repos refreshed per run, and repos
+    # per batched star-count query
+    REFRESH_MAX_REPOS = int(os.getenv("REFRESH_MAX_REPOS", "5000"))
+    REFRESH_BATCH_SIZE = int(os.getenv("REFRESH_BATCH_SIZE", "100"))
+    
+    # Backfill (python -m crawler.backfill): parser processes (0 = one per CPU) and archive
+    # dates handled per batch; each batch writes every touched project record once
+    BACKFILL_WORKERS = int(os.getenv("BACKFILL_WORKERS", "0"))
+    BACKFILL_BATCH_DAYS = int(os.getenv("BACKFILL_BATCH_DAYS", "30"))
+    
+    # Local cache for conditional GitHub requests (ETag / Last-Modified)
+    HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", ".cache/http")
+    HTTP_CACHE_MAX_MB = int(os.getenv("HTTP_CACHE_MAX_MB", "200"))
+    HTTP_CACHE_MAX_AGE_DAYS = int(os.getenv("HTTP_CACHE_MAX_AGE_DAYS", "30"))
+    
+    # Run journal for resuming interrupted runs (also mirrored to data/journal/<date>.json)
+    JOURNAL_DIR = os.getenv("JOURNAL_DIR", ".cache/journal")
+    JOURNAL_CHECKPOINT_SECONDS = int(os.getenv("JOURNAL_CHECKPOINT_SECONDS", "15"))
+    
     # Paths
     DATA_DIR = "data"
@@ -0,0 +1,96 @@
+"""
+Copies every object from one storage backend to another.
+
+    python -m crawler.export DEST [--source SPEC] [--prefix data/] [--force]
+
+SPEC and DEST are backend specs (s3, local:<dir>, sqlite:<path>; a bare path means
+local:<path>). The source defaults to STORAGE_BACKEND, so after local runs against
+sqlite:.cache/crawler.db, `python -m crawler.export public-data` writes the static
+JSON layout the web UI reads, and `python -m crawler.export s3` publishes it. The
+other direction (`--source s3 sqlite:.cache/crawler.db`) seeds a local database.
+Objects the destination already holds with the same content hash are skipped.
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from .backends import BACKEND_ERRORS, LIST_PAGE_SIZE, open_backend
+from .config import Config
+from .storage import IMMUTABLE, cache_control
+
+
+def backend_spec(value):
+    """A bare directory path means the local backend."""
+    if value == "s3" or value.split(":", 1)[0] in ("s3", "local", "sqlite"):
+        return value
+    return f"local:{value}"
+
+
+def _unchanged(source_object, destination_head, key):
+    if destination_head is None:
+        return False
+    digest = source_object["metadata"].get('content-sha256')
+    if digest:
+        return destination_head["metadata"].get('content-sha256') == digest
+    # Content-addressed blobs carry no hash metadata but never change under their key
+    return cache_control(key) == IMMUTABLE
+
+
+def copy_object(source, destination, key, force=False):
+    """Copies one object with its content type, encoding and metadata; returns True if written."""
+    obj = source.get(key)
+    if obj is None:
+        return False
+    if not force and _unchanged(obj, destination.head(key), key):
+        return False
+    destination.put(
+        key,
+        obj["body"],
+        obj["content_type"] or "application/octet-stream",
+        # The current rules, not the header stored with the source object
+        cache_control=cache_control(key),
+        metadata=obj["metadata"],
+        content_encoding=obj["content_encoding"]
+    )
+    return True
+
+
+def export(source, destination, prefix="data/", force=False, workers=None):
+    """Copies every object under prefix, a page of keys at a time; returns (copied, skipped, failed)."""
+    copied = skipped = failed = 0
+
+    def copy(key):
+        try:
+            return key, copy_object(source, destination, key, force), None
+        except (*BACKEND_ERRORS, ValueError) as e:
+            return key, False, e
+
+    keys = source.list_keys(prefix)
+    with ThreadPoolExecutor(max_workers=workers or Config.S3_CONCURRENCY) as executor:
+        while True:
+            page = list(islice(keys, LIST_PAGE_SIZE))
+            if not page:
+                break
+            for key, written, error in executor.map(copy, page):
+                if error is not None:
+                    print(f"Error copying {key}: {error}")
+                    failed += 1
+                elif written:
+                    copied += 1
+                else:
+                    skipped += 1
+            print(f"{copied + skipped + failed} objects: {copied} copied, {skipped} unchanged, {failed} failed")
+    return copied, skipped, failed
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("destination", type=backend_spec, help="backend spec or directory")
+    arg_parser.add_argument("--source", type=backend_spec, help=f"default STORAGE_BACKEND ({Config.STORAGE_BACKEND})")
+    arg_parser.add_argument("--prefix", default="data/", help="only keys under this prefix (default data/)")
+    arg_parser.add_argument("--force", action="store_true", help="copy objects even if unchanged")
+    args = arg_parser.parse_args()
+    source = open_backend(args.source)
+    destination = open_backend(args.destination)
+    print(f"Exporting {args.prefix}* from {source.location} to {destination.location}...")
+    copied, skipped, failed = export(source, destination, args.prefix, args.force)
+    print(f"Done: {copied} copied, {skipped} unchanged, {failed} failed.")
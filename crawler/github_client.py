@@ -1,18 +1,59 @@
+import json
 import requests
-from bs4 import BeautifulSoup
-from github import Github
+from requests.adapters import HTTPAdapter
 from github.GithubException import GithubException
 from .config import Config
+from .http_cache import HttpCache
+from .metrics import metrics
+from .rate_limit import RateLimitScheduler, header
+from .trending import parse_trending_html, merge_trending
 import time
 import logging
+import math
 import random
+from collections import Counter
 from datetime import datetime, timedelta
+from .concurrency import run_ordered
 
 logger = logging.getLogger(__name__)
 
+API_URL = "https://api.github.com"
+GRAPHQL_URL = f"{API_URL}/graphql"
+GRAPHQL_BATCH_SIZE = 50
+# Repos per star-count query; each costs a single GraphQL point
+COUNTS_BATCH_SIZE = 100
+STARGAZERS_PER_PAGE = 100
+# GitHub refuses to paginate stargazers beyond this page
+MAX_STARGAZER_PAGES = 400
+# Root README names tried in the GraphQL query, in order of preference
+README_CANDIDATES = ["README.md", "readme.md", "Readme.md", "README.MD", "README.rst", "README.txt", "README"]
+
+REPO_DETAILS_FRAGMENT = """
+fragment RepoDetails on Repository {
+  nameWithOwner
+  description
+  url
+  createdAt
+  updatedAt
+  pushedAt
+  stargazerCount
+  forkCount
+  primaryLanguage { name }
+  repositoryTopics(first: 20) { nodes { topic { name } } }
+}
+"""
+
 class GitHubClient:
     def __init__(self):
-        self.client = Github(Config.GITHUB_TOKEN) if Config.GITHUB_TOKEN else Github()
+        self.session = requests.Session()
+        self.session.headers.update({"Accept": "application/vnd.github+json"})
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=max(10, Config.GITHUB_CONCURRENCY * Config.STAR_HISTORY_WORKERS)))
+        # Shared budget across threads; picks the token for each request
+        self.scheduler = RateLimitScheduler()
+        self.http_cache = HttpCache()
+        # Pooled connections for the (unauthenticated) trending page scrape
+        self.trending_session = requests.Session()
+        self.trending_session.mount("https://", HTTPAdapter(pool_maxsize=Config.TRENDING_CONCURRENCY))
         self.max_retries = 5
         self.base_delay = 2
         self.max_delay = 900
@@ -20,7 +61,7 @@ class GitHubClient:
 
     def _get_rate_limit_reset_delay(self, exception):
         headers = getattr(exception, "headers", None) or {}
-        reset_value = headers.get("X-RateLimit-Reset") or headers.get("x-ratelimit-reset")
+        reset_value = header(headers, "X-RateLimit-Reset")
         if not reset_value:
             return None
         try:
@@ -35,6 +76,15 @@ class GitHubClient:
         jitter = random.uniform(0, delay * self.jitter_ratio)
         delay = delay + jitter
         if exception and getattr(exception, "status", None) in (403, 429):
+            headers = getattr(exception, "headers", None) or {}
+            if header(headers, "X-RateLimit-Remaining") == "0":
+                # Primary limit: the scheduler recorded the exhausted token and its
+                # acquire() moves to another token or waits for the reset itself
+                return 0
+            retry_after = header(headers, "Retry-After")
+            if retry_after and retry_after.isdigit():
+                # Secondary limit
+                return max(delay, int(retry_after))
             reset_delay = self._get_rate_limit_reset_delay(exception)
             if reset_delay is not None:
                 delay = max(delay, reset_delay)
@@ -50,102 +100,294 @@ class GitHubClient:
                 if e.status in (403, 429, 500, 502, 503, 504):
                     delay = self._compute_backoff(attempt, e)
                     logger.info(f"{label} failed with {e.status}, retrying in {delay:.2f}s")
-                    time.sleep(delay)
+                    self._backoff(delay, e.status)
                     continue
                 raise
             except Exception as e:
                 last_exception = e
                 delay = self._compute_backoff(attempt)
                 logger.info(f"{label} failed, retrying in {delay:.2f}s")
-                time.sleep(delay)
+                self._backoff(delay, "error")
                 continue
         if last_exception:
             raise last_exception
 
-    def get_trending(self, time_range='daily'):
+    @staticmethod
+    def _backoff(delay, reason):
+        metrics.count("github.retries")
+        metrics.count(f"github.retries.{reason}")
+        metrics.count("github.backoff_seconds", delay)
+        time.sleep(delay)
+
+    def _rest_get(self, path, endpoint, params=None, accept=None):
         """
-        Scrapes GitHub trending page.
-        time_range: 'daily', 'weekly', 'monthly'
+        GETs a REST path with conditional headers from the HTTP cache.
+        endpoint is the path template used for the cache hit/miss counters.
+        Returns (body, headers); body is parsed JSON unless a raw media type is requested.
+        Error statuses are raised as GithubException so that _with_retry handles them.
+        """
+        request = requests.Request("GET", f"{API_URL}{path}", params=params).prepare()
+        url = request.url
+        headers = {"Accept": accept} if accept else {}
+        entry = self.http_cache.get(url)
+        if entry:
+            headers.update(HttpCache.conditional_headers(entry))
+
+        token = self.scheduler.acquire("core")
+        if token:
+            headers["Authorization"] = f"token {token}"
+        response = None
+        metrics.count(f"github.requests.GET {endpoint}")
+        try:
+            with metrics.span("github.rest"):
+                response = self.session.get(url, headers=headers, timeout=60)
+        finally:
+            self.scheduler.release(token, "core", response.headers if response is not None else None)
+        if response.status_code == 304 and entry:
+            self.http_cache.record(endpoint, hit=True)
+            self.http_cache.touch(url)
+            return entry["body"], {"Link": entry.get("link") or ""}
+        if response.status_code != 200:
+            raise GithubException(response.status_code, response.text, dict(response.headers))
+
+        self.http_cache.record(endpoint, hit=False)
+        raw = accept is not None and accept.endswith(".raw")
+        body = response.text if raw else response.json()
+        self.http_cache.put(url, body, response.headers)
+        return body, dict(response.headers)
+
+    def _get_repo(self, owner, repo_name):
+        repo, _ = self._rest_get(f"/repos/{owner}/{repo_name}", "/repos/{owner}/{repo}")
+        return repo
+
+    def _get_readme_content(self, owner, repo_name):
+        content, _ = self._rest_get(
+            f"/repos/{owner}/{repo_name}/readme",
+            "/repos/{owner}/{repo}/readme",
+            accept="application/vnd.github.raw"
+        )
+        return content
+
+    def _graphql(self, query):
+        """
+        Posts a GraphQL query and returns its data. HTTP failures and rate-limit
+        errors are raised as GithubException so that _with_retry handles them.
+        """
+        token = self.scheduler.acquire("graphql")
+        response = None
+        metrics.count("github.requests.POST /graphql")
+        try:
+            with metrics.span("github.graphql"):
+                response = self.session.post(
+                    GRAPHQL_URL,
+                    json={"query": query},
+                    headers={"Authorization": f"bearer {token}"},
+                    timeout=60
+                )
+        finally:
+            self.scheduler.release(token, "graphql", response.headers if response is not None else None)
+        headers = dict(response.headers)
+        if response.status_code != 200:
+            raise GithubException(response.status_code, response.text, headers)
+        payload = response.json()
+        errors = payload.get("errors") or []
+        if any(error.get("type") == "RATE_LIMITED" for error in errors):
+            raise GithubException(403, payload, headers)
+        if payload.get("data") is None:
+            raise GithubException(502, payload, headers)
+        return payload["data"]
+
+    @staticmethod
+    def _isoformat(value):
+        # GraphQL returns '...Z' timestamps; normalize to the REST/PyGithub '+00:00' form
+        if not value:
+            return None
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).isoformat()
+
+    def _build_details_query(self, batch):
+        readme_fields = "\n".join(
+            f'    readme{i}: object(expression: {json.dumps("HEAD:" + name)}) {{ ... on Blob {{ text }} }}'
+            for i, name in enumerate(README_CANDIDATES)
+        )
+        repo_blocks = []
+        for i, (owner, repo_name) in enumerate(batch):
+            repo_blocks.append(
+                f"  r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(repo_name)}) {{\n"
+                f"    ...RepoDetails\n{readme_fields}\n  }}"
+            )
+        return "query {\n" + "\n".join(repo_blocks) + "\n}\n" + REPO_DETAILS_FRAGMENT
+
+    def _details_from_graphql(self, owner, repo_name, node):
+        readme = None
+        for i in range(len(README_CANDIDATES)):
+            blob = node.get(f"readme{i}")
+            if blob and blob.get("text") is not None:
+                readme = blob["text"]
+                break
+        if readme is None:
+            # README with an unusual name or location: let the REST endpoint resolve it
+            try:
+                readme = self._with_retry(
+                    lambda: self._get_readme_content(owner, repo_name),
+                    f"GET /repos/{owner}/{repo_name}/readme"
+                )
+            except GithubException as e:
+                if e.status != 404:
+                    raise
+                readme = ""
+        language = node.get("primaryLanguage") or {}
+        return {
+            "owner": owner,
+            "repo": repo_name,
+            "full_name": node["nameWithOwner"],
+            "description": node.get("description"),
+            "html_url": node["url"],
+            "created_at": self._isoformat(node.get("createdAt")),
+            "updated_at": self._isoformat(node.get("updatedAt")),
+            "pushed_at": self._isoformat(node.get("pushedAt")),
+            "stargazers_count": node["stargazerCount"],
+            "forks_count": node["forkCount"],
+            "language": language.get("name"),
+            "topics": [item["topic"]["name"] for item in node["repositoryTopics"]["nodes"]],
+            "readme": readme
+        }
+
+    def get_repo_details_batch(self, repos, batch_size=GRAPHQL_BATCH_SIZE):
+        """
+        Fetches details for many repos with one GraphQL query per batch.
+        repos: iterable of (owner, repo_name) tuples.
+        Returns a dict keyed by (owner, repo_name) with the same shape as
+        get_repo_details, or None for repos that could not be fetched.
         """
-        url = f"https://github.com/trending?since={time_range}"
+        repos = list(dict.fromkeys(repos))
+        if not self.scheduler.authenticated:
+            # The GraphQL API requires authentication; fall back to REST
+            return {(owner, repo_name): self.get_repo_details(owner, repo_name) for owner, repo_name in repos}
+
+        results = {}
+        for start in range(0, len(repos), batch_size):
+            batch = repos[start:start + batch_size]
+            query = self._build_details_query(batch)
+            try:
+                data = self._with_retry(
+                    lambda: self._graphql(query),
+                    f"POST /graphql (details x{len(batch)})"
+                )
+            except GithubException as e:
+                print(f"Error getting batched repo details: {e}")
+                data = {}
+            for i, (owner, repo_name) in enumerate(batch):
+                node = data.get(f"r{i}")
+                if not node:
+                    print(f"Error getting repo details for {owner}/{repo_name}: not found")
+                    results[(owner, repo_name)] = None
+                    continue
+                try:
+                    results[(owner, repo_name)] = self._details_from_graphql(owner, repo_name, node)
+                except GithubException as e:
+                    print(f"Error getting repo details for {owner}/{repo_name}: {e}")
+                    results[(owner, repo_name)] = None
+        return results
+
+    def get_star_counts(self, repos, batch_size=COUNTS_BATCH_SIZE):
+        """
+        Current star and fork counts for many repos, one small GraphQL query per batch
+        (one REST call per repo when unauthenticated).
+        repos: iterable of (owner, repo_name) tuples.
+        Returns a dict keyed by (owner, repo_name) with {"stars", "forks"}, or None for
+        repos that could not be fetched.
+        """
+        repos = list(dict.fromkeys(repos))
+        results = {}
+        if not self.scheduler.authenticated:
+            for owner, repo_name in repos:
+                try:
+                    repo = self._with_retry(
+                        lambda: self._get_repo(owner, repo_name),
+                        f"GET /repos/{owner}/{repo_name}"
+                    )
+                    results[(owner, repo_name)] = {"stars": repo["stargazers_count"], "forks": repo["forks_count"]}
+                except GithubException as e:
+                    print(f"Error getting star count for {owner}/{repo_name}: {e}")
+                    results[(owner, repo_name)] = None
+            return results
+
+        for start in range(0, len(repos), batch_size):
+            batch = repos[start:start + batch_size]
+            query = "query {\n" + "\n".join(
+                f"  r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(repo_name)}) {{ stargazerCount forkCount }}"
+                for i, (owner, repo_name) in enumerate(batch)
+            ) + "\n}\n"
+            try:
+                data = self._with_retry(
+                    lambda: self._graphql(query),
+                    f"POST /graphql (star counts x{len(batch)})"
+                )
+            except GithubException as e:
+                print(f"Error getting batched star counts: {e}")
+                data = {}
+            for i, key in enumerate(batch):
+                node = data.get(f"r{i}")
+                results[key] = {"stars": node["stargazerCount"], "forks": node["forkCount"]} if node else None
+        return results
+
+    def _fetch_trending_page(self, time_range, language=None):
+        path = f"/trending/{language}" if language else "/trending"
+        url = f"https://github.com{path}?since={time_range}"
         print(f"Fetching trending from {url}...")
+        metrics.count("github.requests.GET /trending")
         try:
-            response = requests.get(url)
+            with metrics.span("github.trending_page"):
+                response = self.trending_session.get(url, timeout=30)
             response.raise_for_status()
         except Exception as e:
             print(f"Error fetching trending page: {e}")
-            return []
+            metrics.count("github.errors.trending")
+            return None
+        with metrics.span("trending.parse"):
+            return parse_trending_html(response.content, time_range)
 
-        soup = BeautifulSoup(response.text, 'html.parser')
-        repos = []
-        
-        for article in soup.select('article.Box-row'):
-            try:
-                # Get repo name (owner/repo)
-                h1 = article.select_one('h2.h3 a')
-                if not h1: continue
-                full_name = h1.get_text(strip=True).replace(' ', '')
-                owner, repo_name = full_name.split('/')
-                
-                # Get description
-                p = article.select_one('p.col-9')
-                description = p.get_text(strip=True) if p else ""
-                
-                # Get meta info
-                div = article.select_one('div.f6')
-                
-                # Language
-                lang_span = div.select_one('span[itemprop="programmingLanguage"]')
-                language = lang_span.get_text(strip=True) if lang_span else "Unknown"
-                
-                # Stars and Forks
-                # This part can be tricky as selectors change, but usually they are links
-                links = div.select('a.Link--muted')
-                stars = 0
-                forks = 0
-                if len(links) >= 1:
-                    stars_text = links[0].get_text(strip=True).replace(',', '')
-                    stars = int(stars_text)
-                if len(links) >= 2:
-                    forks_text = links[1].get_text(strip=True).replace(',', '')
-                    forks = int(forks_text)
-                    
-                # Growth (Today stars)
-                # Usually the last span in the div
-                growth_span = div.select_one('span.d-inline-block.float-sm-right')
-                growth = 0
-                if growth_span:
-                    growth_text = growth_span.get_text(strip=True).replace(',', '').replace(' stars today', '').replace(' stars this week', '').replace(' stars this month', '')
-                    try:
-                        growth = int(growth_text)
-                    except ValueError:
-                        pass
-
-                repos.append({
-                    "owner": owner,
-                    "repo": repo_name,
-                    "description": description,
-                    "language": language,
-                    "stars": stars,
-                    "forks": forks,
-                    "growth": growth,
-                    "since": time_range
-                })
-            except Exception as e:
-                print(f"Error parsing repo: {e}")
-                continue
-                
-        return repos
+    def get_trending(self, time_range='daily'):
+        """
+        Scrapes GitHub trending page.
+        time_range: 'daily', 'weekly', 'monthly'
+        """
+        return self._fetch_trending_page(time_range) or []
+
+    def scrape_trending(self, ranges=None, languages=None):
+        """
+        Scrapes every (range, language) trending page concurrently and merges the rows.
+        Returns (rows, failed) where failed lists the (range, language) pages that
+        could not be fetched; rows then only cover the pages that were.
+        """
+        ranges = ranges or Config.TRENDING_RANGES
+        languages = [None] + list(languages if languages is not None else Config.TRENDING_LANGUAGES)
+        pages = [(time_range, language) for time_range in ranges for language in languages]
+        results = run_ordered(
+            lambda page: (page[0], self._fetch_trending_page(*page)),
+            pages,
+            workers=Config.TRENDING_CONCURRENCY
+        )
+        failed = [page for page, (_, rows) in zip(pages, results) if rows is None]
+        return merge_trending((time_range, rows) for time_range, rows in results if rows is not None), failed
+
+    def get_trending_all(self, ranges=None, languages=None):
+        """
+        Scrapes every (range, language) trending page concurrently and merges the rows.
+        Each repo appears once, with the ranges it trended in (see trending.merge_trending).
+        languages: GitHub language slugs; the all-languages page is always included.
+        """
+        return self.scrape_trending(ranges, languages)[0]
 
     def get_repo_details(self, owner, repo_name):
         try:
             repo = self._with_retry(
-                lambda: self.client.get_repo(f"{owner}/{repo_name}"),
+                lambda: self._get_repo(owner, repo_name),
                 f"GET /repos/{owner}/{repo_name}"
             )
             try:
                 readme = self._with_retry(
-                    lambda: self._get_readme_content(repo),
+                    lambda: self._get_readme_content(owner, repo_name),
                     f"GET /repos/{owner}/{repo_name}/readme"
                 )
             except GithubException as e:
@@ -156,45 +398,112 @@ class GitHubClient:
             return {
                 "owner": owner,
                 "repo": repo_name,
-                "full_name": repo.full_name,
-                "description": repo.description,
-                "html_url": repo.html_url,
-                "created_at": repo.created_at.isoformat(),
-                "updated_at": repo.updated_at.isoformat(),
-                "pushed_at": repo.pushed_at.isoformat(),
-                "stargazers_count": repo.stargazers_count,
-                "forks_count": repo.forks_count,
-                "language": repo.language,
-                "topics": self._with_retry(
-                    lambda: repo.get_topics(),
-                    f"GET /repos/{owner}/{repo_name}/topics"
-                ),
+                "full_name": repo["full_name"],
+                "description": repo["description"],
+                "html_url": repo["html_url"],
+                "created_at": self._isoformat(repo["created_at"]),
+                "updated_at": self._isoformat(repo["updated_at"]),
+                "pushed_at": self._isoformat(repo["pushed_at"]),
+                "stargazers_count": repo["stargazers_count"],
+                "forks_count": repo["forks_count"],
+                "language": repo["language"],
+                # The repo payload already carries topics; no separate /topics call needed
+                "topics": repo.get("topics", []),
                 "readme": readme
             }
         except GithubException as e:
             print(f"Error getting repo details for {owner}/{repo_name}: {e}")
             return None
 
-    def _get_readme_content(self, repo):
-        content = repo.get_readme()
-        return content.decoded_content.decode('utf-8')
+    def _get_stargazer_page(self, owner, repo_name, page):
+        stargazers, headers = self._rest_get(
+            f"/repos/{owner}/{repo_name}/stargazers",
+            "/repos/{owner}/{repo}/stargazers",
+            params={"per_page": STARGAZERS_PER_PAGE, "page": page},
+            accept="application/vnd.github.star+json"
+        )
+        return stargazers, headers
+
+    def _fetch_stargazer_pages(self, owner, repo_name, pages, handle_page):
+        """Fetches the given stargazer pages concurrently and maps handle_page over each."""
+        def fetch(page):
+            stargazers, _ = self._with_retry(
+                lambda: self._get_stargazer_page(owner, repo_name, page),
+                f"GET /repos/{owner}/{repo_name}/stargazers?page={page}"
+            )
+            return handle_page(page, stargazers)
+        return run_ordered(fetch, pages, workers=Config.STAR_HISTORY_WORKERS)
 
-    def get_star_history(self, owner, repo_name, current_history=None):
+    def _full_star_history(self, owner, repo_name, total_pages):
+        """Cumulative daily counts built from every stargazer page."""
+        # Only the per-day counts of each page are kept, not the stargazer objects
+        page_counts = self._fetch_stargazer_pages(
+            owner, repo_name, range(1, total_pages + 1),
+            lambda page, stargazers: Counter(s["starred_at"][:10] for s in stargazers)
+        )
+        counts = Counter()
+        for page_count in page_counts:
+            counts.update(page_count)
+        
+        history = []
+        cum_stars = 0
+        for date in sorted(counts):
+            cum_stars += counts[date]
+            history.append({
+                "date": date,
+                "count": cum_stars
+            })
+        return history
+
+    def _sampled_star_history(self, owner, repo_name, total_pages, max_pages):
+        """Sample points from max_pages evenly spaced stargazer pages, first and last included."""
+        if max_pages <= 1:
+            pages = [total_pages]
+        else:
+            step = (total_pages - 1) / (max_pages - 1)
+            pages = sorted({1 + round(i * step) for i in range(max_pages)})
+        
+        def sample(page, stargazers):
+            if not stargazers:
+                return None
+            # The first stargazer on page N is star number (N - 1) * per_page + 1
+            return {
+                "date": stargazers[0]["starred_at"][:10],
+                "count": (page - 1) * STARGAZERS_PER_PAGE + 1
+            }
+        
+        points = self._fetch_stargazer_pages(owner, repo_name, pages, sample)
+        return [point for point in points if point]
+
+    @staticmethod
+    def _make_monotone(history):
+        """Sorts points by date, keeps one point per day and makes counts non-decreasing."""
+        by_date = {}
+        for point in history:
+            by_date[point["date"]] = max(by_date.get(point["date"], 0), point["count"])
+        result = []
+        running_max = 0
+        for date in sorted(by_date):
+            running_max = max(running_max, by_date[date])
+            result.append({"date": date, "count": running_max})
+        return result
+
+    def get_star_history(self, owner, repo_name, current_history=None, max_pages=None, today_str=None):
         """
         Fetches star history. 
         If current_history is provided, it tries to append only new data (optimized).
         Otherwise, it fetches full history (expensive).
         
         NOTE: Getting full star history via API is expensive (1 request per 100 stars).
-        For this MVP, we will use a simplified approach:
-        1. If no history, we fetch sample points or use a 3rd party service if available.
-           Actually, the design doc suggests using `/repos/{owner}/{repo}/stargazers`.
-           Let's implement a sampler for large repos to avoid rate limits.
+        1. If no history, we read `/repos/{owner}/{repo}/stargazers`: every page for small
+           repos, or max_pages evenly spaced sample pages for large ones
+           (default Config.STAR_HISTORY_MAX_PAGES requests per repo).
         2. If history exists, we just append today's count.
+        today_str dates the current count (default today; the crawl date for simulated runs).
         """
         
         # Optimization: Just append today's count if history exists
-        today_str = datetime.now().strftime('%Y-%m-%d')
+        today_str = today_str or datetime.now().strftime('%Y-%m-%d')
         
         if current_history:
             # Check if today is already in history
@@ -203,70 +512,45 @@ class GitHubClient:
             
             # Get current stars
             repo = self._with_retry(
-                lambda: self.client.get_repo(f"{owner}/{repo_name}"),
+                lambda: self._get_repo(owner, repo_name),
                 f"GET /repos/{owner}/{repo_name}"
             )
             current_history.append({
                 "date": today_str,
-                "count": repo.stargazers_count
+                "count": repo["stargazers_count"]
             })
             return current_history
 
         # If no history, we need to fetch it.
-        # Strategy: 
-        # For small repos (< 2000 stars), fetch all.
-        # For large repos, we might need a better strategy or just fetch the last few pages 
-        # to get recent growth, and assume linear growth before? 
-        # Or better: just record "First Seen" as today.
-        
-        # The design doc says: 
-        # "First Seen: Call GitHub API ... (sample for large projects)"
-        # "Daily Update: Append (Today, Current Stars)"
-        
-        # Let's try to get some history.
+        # Strategy:
+        # Small repos (fits in max_pages stargazer pages): fetch every page concurrently.
+        # Large repos: fetch max_pages evenly spaced pages concurrently and use the first
+        # stargazer on each page as a sample point ("Star History" algorithm).
         try:
-            repo = self.client.get_repo(f"{owner}/{repo_name}")
-            total_stars = repo.stargazers_count
+            repo = self._with_retry(
+                lambda: self._get_repo(owner, repo_name),
+                f"GET /repos/{owner}/{repo_name}"
+            )
+            total_stars = repo["stargazers_count"]
+            max_pages = max_pages or Config.STAR_HISTORY_MAX_PAGES
             
-            history = []
+            history = [{
+                "date": repo["created_at"][:10],
+                "count": 0
+            }]
             
-            # If stars > 4000, it's too expensive to fetch all pages (40+ requests).
-            # We will just take the current state as the starting point for "our" tracking.
-            # OR we can try to get the "creation date" as 0 stars.
+            # Pages needed to list every stargazer; the API stops listing after MAX_STARGAZER_PAGES
+            total_pages = min(math.ceil(total_stars / STARGAZERS_PER_PAGE), MAX_STARGAZER_PAGES)
+            if total_stars <= min(max_pages, MAX_STARGAZER_PAGES) * STARGAZERS_PER_PAGE:
+                history.extend(self._full_star_history(owner, repo_name, total_pages))
+            else:
+                history.extend(self._sampled_star_history(owner, repo_name, total_pages, max_pages))
             
             history.append({
-                "date": repo.created_at.strftime('%Y-%m-%d'),
-                "count": 0
+                "date": today_str,
+                "count": total_stars
             })
-            
-            if total_stars < 2000:
-                stargazers = self._with_retry(
-                    lambda: repo.get_stargazers_with_dates(),
-                    f"GET /repos/{owner}/{repo_name}/stargazers"
-                )
-                # Aggregate by day
-                star_dates = [s.starred_at.date() for s in stargazers]
-                from collections import Counter
-                counts = Counter(star_dates)
-                sorted_dates = sorted(counts.keys())
-                
-                cum_stars = 0
-                for date in sorted_dates:
-                    cum_stars += counts[date]
-                    history.append({
-                        "date": date.strftime('%Y-%m-%d'),
-                        "count": cum_stars
-                    })
-            else:
-                # For large repos, just record today. 
-                # Ideally we would use the 'Star History' simplified algorithm (sample pages)
-                # But for now, let's keep it simple: Start tracking from today + creation date.
-                history.append({
-                    "date": today_str,
-                    "count": total_stars
-                })
-                
-            return history
+            return self._make_monotone(history)
             
         except Exception as e:
             print(f"Error fetching star history: {e}")
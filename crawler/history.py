@@ -0,0 +1,122 @@
+"""
+Star history encodings.
+
+Legacy records store star_history as a list of {"date", "count"} points. The compact
+form stores the same series as a start date plus delta-encoded day offsets and counts:
+
+    {"start": "2024-01-01", "days": [0, 3, 1], "counts": [120, 40, -2]}
+
+expands to 2024-01-01: 120, 2024-01-04: 160, 2024-01-05: 158.
+"""
+import datetime
+
+DOWNSAMPLE_SIZES = (100, 500)
+
+
+def _parse_date(value):
+    return datetime.date.fromisoformat(value[:10])
+
+
+def expand(value):
+    """Returns a list of {"date", "count"} points from either the legacy or compact form."""
+    if not value:
+        return []
+    if isinstance(value, list):
+        return [{"date": point["date"], "count": point["count"]} for point in value]
+    if not value.get("days"):
+        return []
+
+    start = _parse_date(value["start"])
+    points = []
+    day = 0
+    count = 0
+    for day_delta, count_delta in zip(value["days"], value["counts"]):
+        day += day_delta
+        count += count_delta
+        points.append({
+            "date": (start + datetime.timedelta(days=day)).isoformat(),
+            "count": count
+        })
+    return points
+
+
+def compact(history):
+    """Encodes a list of {"date", "count"} points (sorted by date) in the compact form."""
+    history = expand(history)
+    if not history:
+        return {"start": None, "days": [], "counts": []}
+    start = _parse_date(history[0]["date"])
+    days = []
+    counts = []
+    prev_day = 0
+    prev_count = 0
+    for point in history:
+        day = (_parse_date(point["date"]) - start).days
+        days.append(day - prev_day)
+        counts.append(point["count"] - prev_count)
+        prev_day = day
+        prev_count = point["count"]
+    return {"start": start.isoformat(), "days": days, "counts": counts}
+
+
+def append_point(history, date_str, count):
+    """Appends (date, count) to an expanded history unless that date is already recorded."""
+    if history and history[-1]["date"] >= date_str:
+        return False
+    history.append({"date": date_str, "count": count})
+    return True
+
+
+def merge(history, points):
+    """
+    Expanded history with the points of another series (either form) added; on a date
+    recorded in both, history's count is kept.
+    """
+    merged = {point["date"]: point["count"] for point in expand(points)}
+    merged.update((point["date"], point["count"]) for point in expand(history))
+    return [{"date": date, "count": count} for date, count in sorted(merged.items())]
+
+
+def lttb(history, threshold):
+    """Largest-Triangle-Three-Buckets downsampling of an expanded history to threshold points."""
+    if threshold >= len(history) or threshold < 3:
+        return list(history)
+
+    xs = [_parse_date(point["date"]).toordinal() for point in history]
+    ys = [point["count"] for point in history]
+    sampled = [history[0]]
+    bucket_size = (len(history) - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, len(history))
+        avg_x = sum(xs[next_start:next_end]) / (next_end - next_start)
+        avg_y = sum(ys[next_start:next_end]) / (next_end - next_start)
+
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        best_area = -1
+        best = start
+        for j in range(start, end):
+            area = abs((xs[a] - avg_x) * (ys[j] - ys[a]) - (xs[a] - xs[j]) * (avg_y - ys[a]))
+            if area > best_area:
+                best_area = area
+                best = j
+        sampled.append(history[best])
+        a = best
+    sampled.append(history[-1])
+    return sampled
+
+
+def history_key(owner, repo_name):
+    return f"data/history/{owner}/{repo_name}.json"
+
+
+def downsampled(history, sizes=DOWNSAMPLE_SIZES):
+    """Chart-ready payload with compact LTTB series at each size, written next to the project record."""
+    history = expand(history)
+    return {
+        "points": len(history),
+        "lttb": {str(size): compact(lttb(history, size)) for size in sizes}
+    }
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from .config import Config
+
+
+class HttpCache:
+    """
+    Disk-backed cache of GET responses keyed by URL.
+    Stores the ETag / Last-Modified validators next to the body so requests can be
+    made conditional; a 304 reply is then served from the cached body.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=None, max_age_days=None):
+        self.cache_dir = cache_dir or Config.HTTP_CACHE_DIR
+        self.max_bytes = max_bytes if max_bytes is not None else Config.HTTP_CACHE_MAX_MB * 1024 * 1024
+        self.max_age = (max_age_days if max_age_days is not None else Config.HTTP_CACHE_MAX_AGE_DAYS) * 86400
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, url):
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.json")
+
+    def get(self, url):
+        """Returns the cached entry for url, or None if missing or expired."""
+        path = self._path(url)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    def put(self, url, body, headers):
+        """Stores a response body if the server sent a validator for it."""
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "link": headers.get("Link"),
+            "body": body
+        }
+        path = self._path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing HTTP cache entry for {url}: {e}")
+
+    def touch(self, url):
+        """Marks an entry as fresh after the server confirmed it with a 304."""
+        try:
+            os.utime(self._path(url))
+        except OSError:
+            pass
+
+    @staticmethod
+    def conditional_headers(entry):
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def record(self, endpoint, hit):
+        with self._lock:
+            if hit:
+                self.hits[endpoint] += 1
+            else:
+                self.misses[endpoint] += 1
+
+    def stats(self):
+        """Hit/miss counters per endpoint."""
+        with self._lock:
+            endpoints = sorted(set(self.hits) | set(self.misses))
+            return {
+                endpoint: {"hits": self.hits[endpoint], "misses": self.misses[endpoint]}
+                for endpoint in endpoints
+            }
+
+    def evict(self):
+        """Drops expired entries, then the least recently used ones until under max_bytes."""
+        entries = []
+        now = time.time()
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if now - stat.st_mtime > self.max_age or name.endswith('.tmp'):
+                    self._remove(path)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+            removed += 1
+        return removed
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
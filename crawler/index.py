@@ -0,0 +1,118 @@
+import datetime
+from collections import Counter
+from .config import Config
+from .storage import content_hash
+
+INDEX_MANIFEST_KEY = "data/index/manifest.json"
+LEGACY_INDEX_KEY = "data/index.json"
+
+
+def shard_for(owner, shard_count):
+    """
+    Shard id for an owner: FNV-1a (32-bit) of the lowercased owner, as two or more hex digits.
+    web/src/lib/api.ts implements the same function so clients can locate a repo's shard.
+    """
+    h = 0x811c9dc5
+    for byte in owner.lower().encode('utf-8'):
+        h ^= byte
+        h = (h * 0x01000193) & 0xffffffff
+    return format(h % shard_count, '02x')
+
+
+def shard_key(shard_id):
+    return f"data/index/shards/{shard_id}.json"
+
+
+class ShardedIndex:
+    """
+    The project index split into owner-hashed shards plus a small manifest.
+    Only the shards holding changed repos are read and rewritten on update.
+    """
+
+    def __init__(self, storage, shard_count=None):
+        self.storage = storage
+        self.shard_count = shard_count or Config.INDEX_SHARD_COUNT
+        self.manifest = None
+
+    def load_manifest(self):
+        """
+        Reads the manifest; a missing one starts an empty index. Read errors raise rather
+        than passing for a first run, which would republish the index without its shards.
+        """
+        manifest = self.storage.read_json(INDEX_MANIFEST_KEY)
+        if manifest:
+            # Keep the layout already published; changing the shard count needs a rebuild
+            self.shard_count = manifest["shard_count"]
+        else:
+            manifest = {"version": 1, "hash": "fnv1a32", "shard_count": self.shard_count, "shards": {}}
+        self.manifest = manifest
+        return manifest
+
+    def _group(self, entries):
+        shards = {}
+        for entry in entries:
+            shards.setdefault(shard_for(entry['owner'], self.shard_count), []).append(entry)
+        return shards
+
+    def update(self, entries, updated=None):
+        """Merges index entries (keyed by owner/repo) into their shards and republishes them."""
+        if self.manifest is None:
+            self.load_manifest()
+        entries = list(entries)
+        legacy = {}
+        if not self.manifest["shards"]:
+            # First sharded run: carry over everything from the legacy single-file index
+            legacy_entries = self.storage.read_json(LEGACY_INDEX_KEY) or []
+            if legacy_entries:
+                print(f"Migrating {len(legacy_entries)} entries from {LEGACY_INDEX_KEY} into shards...")
+            legacy = self._group(legacy_entries)
+        if not entries and not legacy:
+            return []
+
+        grouped = self._group(entries)
+        shard_ids = sorted(set(grouped) | set(legacy))
+        current, errors = self.storage.get_many(shard_key(shard_id) for shard_id in shard_ids)
+        if errors:
+            raise RuntimeError(f"Could not load index shards: {', '.join(sorted(errors))}")
+
+        changed_shards = {}
+        for shard_id in shard_ids:
+            # Legacy entries, then what the shard already holds, then the new entries
+            index_map = {}
+            for item in legacy.get(shard_id, []) + (current[shard_key(shard_id)] or []):
+                index_map[f"{item['owner']}/{item['repo']}"] = item
+            for entry in grouped.get(shard_id, []):
+                index_map[f"{entry['owner']}/{entry['repo']}"] = entry
+            changed_shards[shard_id] = sorted(index_map.values(), key=lambda item: (item['owner'], item['repo']))
+
+        _, errors = self.storage.put_many(
+            (shard_key(shard_id), shard_entries) for shard_id, shard_entries in changed_shards.items()
+        )
+        if errors:
+            raise RuntimeError(f"Could not write index shards: {', '.join(sorted(errors))}")
+
+        updated = updated or datetime.datetime.now().strftime('%Y-%m-%d')
+        for shard_id, shard_entries in changed_shards.items():
+            tags = Counter(tag for item in shard_entries for tag in item.get('tags') or [])
+            self.manifest["shards"][shard_id] = {
+                "key": shard_key(shard_id),
+                "count": len(shard_entries),
+                "hash": content_hash(shard_entries),
+                "tags": dict(sorted(tags.items())),
+                "updated": updated
+            }
+        self.manifest["total"] = sum(shard["count"] for shard in self.manifest["shards"].values())
+        self.manifest["updated"] = updated
+        self.storage.upload_json(INDEX_MANIFEST_KEY, self.manifest)
+        return sorted(changed_shards)
+
+    def load_all(self):
+        """Reads every shard and returns all index entries."""
+        if self.manifest is None:
+            self.load_manifest()
+        if not self.manifest["shards"]:
+            return self.storage.read_json(LEGACY_INDEX_KEY) or []
+        shards, errors = self.storage.get_many(shard["key"] for shard in self.manifest["shards"].values())
+        if errors:
+            raise RuntimeError(f"Could not load index shards: {', '.join(sorted(errors))}")
+        return [entry for entries in shards.values() for entry in entries or []]
@@ -0,0 +1,113 @@
+import json
+import os
+import threading
+import time
+from .config import Config
+
+# Per-repo stages, in pipeline order
+STAGES = ("scraped", "detailed", "tagged", "history", "persisted")
+
+
+def journal_key(date_str):
+    return f"data/journal/{date_str}.json"
+
+
+class RunJournal:
+    """
+    Checkpoint of one crawl date, so a restarted or retried run skips finished work.
+
+    Holds the scraped trending list, the stage each repo reached with the data produced
+    so far (details, tags, star history, daily entry, whether it was indexed).
+    It is written to a local file and mirrored to the bucket at every checkpoint, so a
+    retry on another machine can resume too.
+    """
+
+    def __init__(self, storage, date_str, local_dir=None):
+        self.storage = storage
+        self.date_str = date_str
+        self.local_path = os.path.join(local_dir or Config.JOURNAL_DIR, f"{date_str}.json")
+        # The store the run writes to: a journal only describes objects in that store
+        self.state = {"date": date_str, "bucket": storage.bucket, "trending": None, "repos": {}}
+        self._lock = threading.Lock()
+        self._checkpoint_lock = threading.Lock()
+        self._last_checkpoint = 0
+
+    @classmethod
+    def load(cls, storage, date_str, local_dir=None):
+        journal = cls(storage, date_str, local_dir)
+        state = None
+        try:
+            with open(journal.local_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            pass
+        if not state or state.get("bucket") != storage.bucket:
+            # No local journal, or one from a run against another bucket or backend
+            state = storage.get_json(journal_key(date_str))
+            if state:
+                state.setdefault("bucket", storage.bucket)
+        if state and state.get("date") == date_str and state.get("bucket") == storage.bucket:
+            journal.state = state
+            done = sum(1 for repo in state["repos"].values() if repo["stage"] == "persisted")
+            print(f"Resuming run for {date_str}: {done}/{len(state['repos'])} repos already persisted.")
+        return journal
+
+    @property
+    def trending(self):
+        return self.state["trending"]
+
+    def set_trending(self, trending_repos):
+        with self._lock:
+            self.state["trending"] = trending_repos
+            for repo_summary in trending_repos:
+                full_name = f"{repo_summary['owner']}/{repo_summary['repo']}"
+                self.state["repos"].setdefault(full_name, {"stage": "scraped"})
+
+    def get(self, full_name, field=None):
+        with self._lock:
+            repo = self.state["repos"].get(full_name, {})
+            return repo.get(field) if field else repo.get("stage")
+
+    def reached(self, full_name, stage):
+        """Whether the repo has completed stage (or a later one)."""
+        current = self.get(full_name)
+        return current is not None and STAGES.index(current) >= STAGES.index(stage)
+
+    def record(self, full_name, stage, **data):
+        """Marks stage done for a repo and stores the data it produced."""
+        with self._lock:
+            repo = self.state["repos"].setdefault(full_name, {"stage": "scraped"})
+            if STAGES.index(stage) > STAGES.index(repo["stage"]):
+                repo["stage"] = stage
+            repo.update(data)
+
+    def checkpoint(self, upload=True):
+        """Writes the journal locally and (by default) to the bucket."""
+        with self._checkpoint_lock:
+            self._write(upload)
+
+    def _write(self, upload):
+        with self._lock:
+            payload = json.dumps(self.state, ensure_ascii=False)
+            self._last_checkpoint = time.time()
+        try:
+            os.makedirs(os.path.dirname(self.local_path), exist_ok=True)
+            tmp_path = f"{self.local_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_path, self.local_path)
+        except OSError as e:
+            print(f"Error writing run journal: {e}")
+        if upload:
+            self.storage.upload_json(journal_key(self.date_str), json.loads(payload))
+
+    def checkpoint_soon(self):
+        """Checkpoints if the last one is older than Config.JOURNAL_CHECKPOINT_SECONDS."""
+        if time.time() - self._last_checkpoint < Config.JOURNAL_CHECKPOINT_SECONDS:
+            return
+        # Another thread already writing a checkpoint covers this one
+        if self._checkpoint_lock.acquire(blocking=False):
+            try:
+                self._write(upload=True)
+            finally:
+                self._checkpoint_lock.release()
@@ -1,54 +1,193 @@
 from google import genai
 from google.genai import types
 from .config import Config
+from .concurrency import run_ordered
+from .metrics import metrics
+import hashlib
 import json
+import os
+import threading
+
+# Tag taxonomy offered to the model, by group
+CATEGORIES = {
+    "Infrastructure & Training": ["Foundation Model", "Inference & Serving", "Fine-tuning & Training", "Quantization"],
+    "App Development": ["Agent Framework", "Workflow Orchestration", "RAG", "Vector Database"],
+    "Verticals & Tools": ["Coding Assistant", "Chatbot", "Image & Video Generation", "Audio & Speech"],
+    "Ops & Eval": ["LLMOps & Evaluation", "Security & Safety"],
+    "Others": ["Data & Datasets", "Non-AI"],
+}
+ALL_TAGS = [tag for tags in CATEGORIES.values() for tag in tags]
+README_SNIPPET_CHARS = 2000 # Truncate readme to save tokens
+
+
+def readme_snippet(repo_data):
+    # Stored records only keep an excerpt of the README (see crawler/readmes.py)
+    return (repo_data.get('readme') or repo_data.get('readme_excerpt') or '')[:README_SNIPPET_CHARS]
+
+
+def tag_cache_key(repo_data):
+    """Hash of everything the tags depend on: description, README snippet and the taxonomy."""
+    parts = [
+        repo_data.get('description') or '',
+        readme_snippet(repo_data),
+        json.dumps(CATEGORIES, sort_keys=True)
+    ]
+    return hashlib.sha256("\0".join(parts).encode('utf-8')).hexdigest()
+
+
+class TagCache:
+    """Persistent map of tag_cache_key -> tags, so unchanged repos never reach the model twice."""
+
+    def __init__(self, path=None):
+        self.path = path or Config.TAG_CACHE_PATH
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def get(self, key):
+        with self._lock:
+            return self.entries.get(key)
+
+    def put(self, key, tags):
+        with self._lock:
+            self.entries[key] = tags
+
+    def save(self):
+        with self._lock:
+            entries = dict(self.entries)
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Error saving tag cache: {e}")
+
 
 class LLMClient:
     def __init__(self):
-        self.client = genai.Client(api_key=Config.GEMINI_API_KEY)
+        # Without a key the crawler still runs, tagging with the local classifier only
+        self.client = genai.Client(api_key=Config.GEMINI_API_KEY) if Config.GEMINI_API_KEY else None
         self.model_name = "gemini-3-flash-preview" # Using a reliable recent model, or gemini-1.5-flash
+        self.tag_cache = TagCache()
 
-    def generate_tags(self, repo_data):
-        """
-        Generates tags for a repository based on its description and readme.
-        """
-        if not Config.GEMINI_API_KEY:
-            print("Warning: GEMINI_API_KEY not set. Skipping tagging.")
-            return []
+    def _category_lines(self):
+        return "\n".join(f"        - {group}: {', '.join(tags)}" for group, tags in CATEGORIES.items())
 
-        description = repo_data.get('description', '')
-        readme = repo_data.get('readme', '')[:2000] # Truncate readme to save tokens
-        
-        prompt = f"""
-        Analyze the following GitHub repository and assign relevant categories/tags to it.
-        
+    def _build_batch_prompt(self, repos):
+        repo_blocks = "\n".join(
+            f"""
+        [{i}]
         Repo: {repo_data.get('full_name')}
-        Description: {description}
-        Readme Snippet: {readme}
-        
+        Description: {repo_data.get('description') or ''}
+        Readme Snippet: {readme_snippet(repo_data)}
+        """
+            for i, repo_data in enumerate(repos)
+        )
+        return f"""
+        Analyze each of the following GitHub repositories and assign relevant categories/tags to it.
+        {repo_blocks}
         The available categories are:
-        - Infrastructure & Training: Foundation Model, Inference & Serving, Fine-tuning & Training, Quantization
-        - App Development: Agent Framework, Workflow Orchestration, RAG, Vector Database
-        - Verticals & Tools: Coding Assistant, Chatbot, Image & Video Generation, Audio & Speech
-        - Ops & Eval: LLMOps & Evaluation, Security & Safety
-        - Others: Data & Datasets, Non-AI
+{self._category_lines()}
         
-        Please return a JSON object with a single key "tags" containing a list of strings.
-        Example: {{"tags": ["Agent Framework", "RAG"]}}
+        Return a JSON array with one object per repository: {{"id": <number in brackets>, "tags": [...]}}.
+        Example: [{{"id": 0, "tags": ["Agent Framework", "RAG"]}}]
         Only return the JSON.
         """
-        
+
+    def _response_schema(self):
+        return types.Schema(
+            type=types.Type.ARRAY,
+            items=types.Schema(
+                type=types.Type.OBJECT,
+                properties={
+                    "id": types.Schema(type=types.Type.INTEGER),
+                    "tags": types.Schema(
+                        type=types.Type.ARRAY,
+                        items=types.Schema(type=types.Type.STRING, enum=ALL_TAGS)
+                    ),
+                },
+                required=["id", "tags"]
+            )
+        )
+
+    def _tag_batch(self, repos):
+        """One structured-output request for a batch of repos; returns tags per repo (None on failure)."""
+        metrics.count("llm.requests")
+        metrics.count("llm.repos", len(repos))
         try:
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    response_mime_type="application/json"
+            with metrics.span("llm.request"):
+                response = self.client.models.generate_content(
+                    model=self.model_name,
+                    contents=self._build_batch_prompt(repos),
+                    config=types.GenerateContentConfig(
+                        response_mime_type="application/json",
+                        response_schema=self._response_schema()
+                    )
                 )
-            )
-            
-            result = json.loads(response.text)
-            return result.get("tags", [])
+            self._count_tokens(response)
+            results = [None] * len(repos)
+            for item in json.loads(response.text):
+                if 0 <= item.get("id", -1) < len(repos):
+                    results[item["id"]] = [tag for tag in item.get("tags", []) if tag in ALL_TAGS]
+            return results
         except Exception as e:
             print(f"Error generating tags: {e}")
-            return []
+            metrics.count("llm.errors")
+            return [None] * len(repos)
+
+    @staticmethod
+    def _count_tokens(response):
+        usage = getattr(response, "usage_metadata", None)
+        for field, name in (
+            ("prompt_token_count", "llm.prompt_tokens"),
+            ("candidates_token_count", "llm.output_tokens"),
+            ("total_token_count", "llm.total_tokens"),
+        ):
+            value = getattr(usage, field, None)
+            if value:
+                metrics.count(name, value)
+
+    def generate_tags_batch(self, repos, batch_size=None):
+        """
+        Generates tags for many repositories, batch_size repos per model request.
+        Repos whose description/README/taxonomy hash is already cached skip the model.
+        Returns a list of tag lists in the order of repos.
+        """
+        repos = list(repos)
+        if not Config.GEMINI_API_KEY:
+            print("Warning: GEMINI_API_KEY not set. Skipping tagging.")
+            return [[] for _ in repos]
+
+        keys = [tag_cache_key(repo_data) for repo_data in repos]
+        results = [self.tag_cache.get(key) for key in keys]
+        pending = [i for i, tags in enumerate(results) if tags is None]
+        metrics.count("llm.cache_hits", len(repos) - len(pending))
+        if pending:
+            print(f"Tagging {len(pending)} repos ({len(repos) - len(pending)} cached)...")
+        batch_size = batch_size or Config.LLM_BATCH_SIZE
+        batches = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+
+        batch_results = run_ordered(
+            lambda batch: self._tag_batch([repos[i] for i in batch]),
+            batches,
+            workers=Config.LLM_CONCURRENCY
+        )
+        for batch, tags_list in zip(batches, batch_results):
+            for i, tags in zip(batch, tags_list):
+                if tags is None:
+                    results[i] = []
+                    continue
+                self.tag_cache.put(keys[i], tags)
+                results[i] = tags
+        return results
+
+    def generate_tags(self, repo_data):
+        """
+        Generates tags for a repository based on its description and readme.
+        """
+        return self.generate_tags_batch([repo_data])[0]
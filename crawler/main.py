@@ -1,128 +1,305 @@
 import datetime
 import json
 import os
-import time
 from .config import Config
+from .classifier import tag_repos
+from . import history as star_history
+from .concurrency import ConcurrencyLimits, run_ordered
 from .storage import Storage
+from .trending import growth_per_day
 from .github_client import GitHubClient
+from .index import INDEX_MANIFEST_KEY, ShardedIndex
+from .journal import RunJournal
 from .llm import LLMClient
+from .metrics import metrics, runs_key
+from .publish import publish_changes
+from .readmes import split_readme, store_readme
+from .rollups import ROLLUP_WINDOWS, daily_key, rollup_key, update_rollups
 
-def main():
-    print("Starting AI Trending Crawler...")
-    
-    storage = Storage()
-    gh_client = GitHubClient()
-    llm_client = LLMClient()
-    
-    today_str = datetime.datetime.now().strftime('%Y-%m-%d')
-    
-    # 1. Get Trending Data
-    trending_repos = gh_client.get_trending(time_range='daily')
-    print(f"Found {len(trending_repos)} trending repos today.")
+def project_key(owner, repo_name):
+    return f"data/projects/{owner}/{repo_name}.json"
+
+def full_name_of(repo_summary):
+    return f"{repo_summary['owner']}/{repo_summary['repo']}"
+
+def process_repo(repo_summary, existing_data, details, storage, gh_client, limits, today_str, journal):
+    """
+    Updates or creates the project record for one trending repo, saves it and
+    returns its entry for the daily summary (None if the repo was skipped).
+    existing_data is the stored record (None for new repos) and details the
+    prefetched GitHub details for new repos, already tagged.
+    """
+    owner = repo_summary['owner']
+    repo_name = repo_summary['repo']
+    full_name = full_name_of(repo_summary)
+    file_key = project_key(owner, repo_name)
     
-    processed_repos = []
+    print(f"Processing {owner}/{repo_name}...")
     
-    for repo_summary in trending_repos:
-        owner = repo_summary['owner']
-        repo_name = repo_summary['repo']
-        file_key = f"data/projects/{owner}/{repo_name}.json"
-        
-        print(f"Processing {owner}/{repo_name}...")
+    if existing_data:
+        print("  - Found existing data. Updating...")
+        repo_data = existing_data
         
-        # 2. Check if exists in Storage
-        existing_data = storage.get_json(file_key)
+        # Update Star History (Append today's growth if possible)
+        # If we trust the trending data 'stars' count:
+        current_stars = repo_summary['stars']
         
-        if existing_data:
-            print("  - Found existing data. Updating...")
-            repo_data = existing_data
-            
-            # Update Star History (Append today's growth if possible)
-            # If we trust the trending data 'stars' count:
-            current_stars = repo_summary['stars']
-            
-            # Check if today is already recorded
-            history = repo_data.get('star_history', [])
-            if not history or history[-1]['date'] != today_str:
-                history.append({
-                    "date": today_str,
-                    "count": current_stars
-                })
-                repo_data['star_history'] = history
-                
-            # Update basic info
-            repo_data['stargazers_count'] = current_stars
-            repo_data['forks_count'] = repo_summary['forks']
-            repo_data['updated_at'] = datetime.datetime.now().isoformat()
+        # Append today unless already recorded (legacy list or compact form)
+        history = star_history.expand(repo_data.get('star_history'))
+        star_history.append_point(history, today_str, current_stars)
             
+        # Update basic info
+        repo_data['stargazers_count'] = current_stars
+        repo_data['forks_count'] = repo_summary['forks']
+        repo_data['updated_at'] = datetime.datetime.now().isoformat()
+        
+    else:
+        print("  - New project. Using batched details...")
+        if not details:
+            print("  - Failed to get details. Skipping.")
+            return None
+        
+        # Get Star History (Initial), unless an interrupted run already fetched it
+        if journal.reached(full_name, "history"):
+            history = star_history.expand(journal.get(full_name, "history"))
         else:
-            print("  - New project. Fetching full details...")
-            # Fetch details from GitHub API
-            details = gh_client.get_repo_details(owner, repo_name)
-            if not details:
-                print("  - Failed to get details. Skipping.")
-                continue
-                
-            # Generate Tags
-            print("  - Generating tags...")
-            tags = llm_client.generate_tags(details)
-            details['tags'] = tags
-            
-            # Get Star History (Initial)
             print("  - Fetching star history...")
-            history = gh_client.get_star_history(owner, repo_name)
-            details['star_history'] = history
-            
-            repo_data = details
+            with limits.github, metrics.span("star_history", repo=full_name):
+                history = gh_client.get_star_history(owner, repo_name, today_str=today_str)
+            journal.record(full_name, "history", history=star_history.compact(history))
+        # Keep points a backfill recorded before the repo's first live crawl
+        history = star_history.merge(history, details.get('star_history'))
         
-        # 3. Save Project Data
+        repo_data = details
+    
+    # 3. Save Project Data (compact full series) and the downsampled chart series
+    repo_data['star_history'] = star_history.compact(history)
+    with limits.s3, metrics.span("persist", repo=full_name):
+        # README bodies live in content-addressed blobs; older records are migrated here
+        split_readme(storage, repo_data)
         storage.upload_json(file_key, repo_data)
-        
-        # Add to list for daily summary
-        processed_repos.append({
-            "owner": owner,
-            "repo": repo_name,
-            "description": repo_data.get('description'),
-            "language": repo_data.get('language'),
-            "stars": repo_data.get('stargazers_count'),
-            "forks": repo_data.get('forks_count'),
-            "growth": repo_summary.get('growth'),
-            "tags": repo_data.get('tags', [])
-        })
-        
-        # Sleep briefly to avoid rate limits if doing heavy API calls
-        time.sleep(1)
+        storage.upload_json(star_history.history_key(owner, repo_name), star_history.downsampled(history))
+    
+    # Add to list for daily summary
+    entry = {
+        "owner": owner,
+        "repo": repo_name,
+        "description": repo_data.get('description'),
+        "language": repo_data.get('language'),
+        "stars": repo_data.get('stargazers_count'),
+        "forks": repo_data.get('forks_count'),
+        "growth": repo_summary.get('growth'),
+        "ranges": repo_summary.get('ranges', ['daily']),
+        "growth_by_range": repo_summary.get('growth_by_range', {}),
+        "tags": repo_data.get('tags', [])
+    }
+    journal.record(full_name, "persisted", entry=entry)
+    journal.checkpoint_soon()
+    return entry
+
+def main(storage=None, gh_client=None, llm_client=None, today_str=None):
+    """
+    Runs one crawl. The clients and the crawl date default to the real services
+    and today; the benchmarks (crawler/benchmarks/pipeline.py) pass stand-ins.
+    """
+    print("Starting AI Trending Crawler...")
+    metrics.reset()
+    
+    storage = storage or Storage()
+    gh_client = gh_client or GitHubClient()
+    llm_client = llm_client or LLMClient()
+    
+    today_str = today_str or datetime.datetime.now().strftime('%Y-%m-%d')
+    
+    # Resume today's run if an earlier attempt was interrupted
+    journal = RunJournal.load(storage, today_str)
+    
+    # 1. Get Trending Data (daily/weekly/monthly and configured languages, merged)
+    metrics.stage("trending")
+    if not journal.trending:
+        trending_repos, failed_pages = gh_client.scrape_trending()
+        if not trending_repos:
+            raise RuntimeError("The trending scrape returned no repos; nothing to publish for today.")
+        if failed_pages:
+            # A partial scrape is used but not journaled, so a retry scrapes every page again
+            print(f"{len(failed_pages)} trending pages could not be fetched: {failed_pages}")
+        else:
+            journal.set_trending(trending_repos)
+            journal.checkpoint()
+        print(f"Found {len(trending_repos)} trending repos today.")
+    else:
+        trending_repos = journal.trending
+        print(f"Using {len(trending_repos)} trending repos from the run journal.")
+    
+    limits = ConcurrencyLimits()
+    pending_repos = [
+        repo_summary for repo_summary in trending_repos
+        if not journal.reached(full_name_of(repo_summary), "persisted")
+    ]
+    
+    # 2. Load existing project records for all pending repos in one concurrent batch
+    metrics.stage("load_records")
+    existing_map, load_errors = storage.get_many(
+        project_key(repo_summary['owner'], repo_summary['repo']) for repo_summary in pending_repos
+    )
+    if load_errors:
+        # Don't mistake an unreadable record for a new project and overwrite it
+        print(f"Skipping {len(load_errors)} repos whose records could not be loaded.")
+        pending_repos = [
+            repo_summary for repo_summary in pending_repos
+            if project_key(repo_summary['owner'], repo_summary['repo']) not in load_errors
+        ]
+    # Records created by crawler.backfill have no GitHub details yet: treat them as new repos
+    backfilled = {key: record for key, record in existing_map.items() if record and record.get('backfilled')}
+    existing_records = [
+        None if key in backfilled else existing_map[key]
+        for key in (project_key(repo_summary['owner'], repo_summary['repo']) for repo_summary in pending_repos)
+    ]
+    
+    # Fetch details for all new repos in batched GraphQL queries
+    metrics.stage("details")
+    details_map = {}
+    new_repos = []
+    for repo_summary, existing_data in zip(pending_repos, existing_records):
+        if existing_data:
+            continue
+        key = (repo_summary['owner'], repo_summary['repo'])
+        if journal.reached(full_name_of(repo_summary), "detailed"):
+            details_map[key] = journal.get(full_name_of(repo_summary), "details")
+        else:
+            new_repos.append(key)
+    if new_repos:
+        print(f"Fetching details for {len(new_repos)} new repos...")
+        fetched = gh_client.get_repo_details_batch(new_repos)
+        # Upload READMEs as blobs now; the text stays in memory for tagging only
+        run_ordered(
+            lambda details: store_readme(storage, details),
+            [details for details in fetched.values() if details],
+            workers=Config.S3_CONCURRENCY
+        )
+        for (owner, repo_name), details in fetched.items():
+            details_map[(owner, repo_name)] = details
+            if details and project_key(owner, repo_name) in backfilled:
+                details['star_history'] = backfilled[project_key(owner, repo_name)].get('star_history')
+            if details:
+                journal.record(
+                    f"{owner}/{repo_name}", "detailed",
+                    details={field: value for field, value in details.items() if field != 'readme'}
+                )
+    
+    # Generate Tags for all new repos: local topic/keyword classifier first,
+    # batched LLM requests (cached by README hash) only for low-confidence repos
+    metrics.stage("tagging")
+    untagged = []
+    for (owner, repo_name), details in details_map.items():
+        if not details:
+            continue
+        if journal.reached(f"{owner}/{repo_name}", "tagged"):
+            details['tags'] = journal.get(f"{owner}/{repo_name}", "tags")
+            details['tags_source'] = journal.get(f"{owner}/{repo_name}", "tags_source")
+        else:
+            untagged.append(details)
+    if untagged:
+        tag_repos(untagged, llm_client)
+        for details in untagged:
+            journal.record(
+                f"{details['owner']}/{details['repo']}", "tagged",
+                tags=details['tags'], tags_source=details['tags_source']
+            )
+    journal.checkpoint()
+    
+    def process(item):
+        with metrics.span("repo", repo=full_name_of(item[0])):
+            return process_repo(
+                item[0], item[1], details_map.get((item[0]['owner'], item[0]['repo'])),
+                storage, gh_client, limits, today_str, journal
+            )
+    
+    metrics.stage("process")
+    try:
+        run_ordered(process, list(zip(pending_repos, existing_records)))
+    finally:
+        # Keep the progress of a failed or interrupted run for the retry
+        journal.checkpoint()
+    # Daily entries in trending order, including repos persisted by an earlier attempt;
+    # skipped repos are dropped
+    processed_repos = [
+        journal.get(full_name_of(repo_summary), "entry")
+        for repo_summary in trending_repos
+        if journal.reached(full_name_of(repo_summary), "persisted")
+    ]
 
     # 4. Save Daily Trending
-    daily_key = f"data/daily/{today_str}.json"
-    storage.upload_json(daily_key, processed_repos)
+    metrics.stage("daily")
+    storage.upload_json(daily_key(today_str), processed_repos)
+    
+    # Weekly/monthly rollups, updated from yesterday's rollups and today's snapshot
+    metrics.stage("rollups")
+    update_rollups(storage, today_str, processed_repos)
     
     # 5. Update Index (All Projects Summary)
-    # Ideally, we should read the existing index and merge.
-    # But listing all files in S3 is expensive if there are many.
-    # For now, let's just assume we might want to rebuild it or maintain it incrementally.
-    # A simple approach for this MVP:
-    # Read index.json, update entries for processed_repos, write back.
-    
-    index_key = "data/index.json"
-    index_data = storage.get_json(index_key) or []
-    
-    # Create a map for faster lookup
-    index_map = {f"{item['owner']}/{item['repo']}": item for item in index_data}
-    
-    for repo in processed_repos:
-        full_name = f"{repo['owner']}/{repo['repo']}"
-        index_map[full_name] = {
-            "owner": repo['owner'],
-            "repo": repo['repo'],
-            "description": repo['description'],
-            "stars": repo['stars'],
-            "tags": repo['tags'],
-            "language": repo['language'],
-            "last_seen": today_str
-        }
-        
-    new_index_data = list(index_map.values())
-    storage.upload_json(index_key, new_index_data)
+    # The index is sharded by owner hash (see crawler/index.py): only the shards
+    # containing today's repos are read and rewritten, plus the small manifest.
+    metrics.stage("index")
+    # Only repos not indexed by an earlier attempt: a retry after a partial run (failed
+    # trending page, unreadable records) still indexes the repos it adds
+    unindexed = [repo for repo in processed_repos if not journal.get(full_name_of(repo), "indexed")]
+    if not unindexed:
+        print("Index already updated by an earlier attempt.")
+    else:
+        index = ShardedIndex(storage)
+        changed_shards = index.update(
+            (
+                {
+                    "owner": repo['owner'],
+                    "repo": repo['repo'],
+                    "description": repo['description'],
+                    "stars": repo['stars'],
+                    "tags": repo['tags'],
+                    "language": repo['language'],
+                    "growth_per_day": growth_per_day(repo.get('growth_by_range') or {}),
+                    "last_seen": today_str
+                }
+                for repo in unindexed
+            ),
+            updated=today_str
+        )
+        print(f"Updated {len(changed_shards)} index shards.")
+        for repo in unindexed:
+            journal.record(full_name_of(repo), "persisted", indexed=True)
+    journal.checkpoint()
+    
+    # 6. Report and trim the conditional-request cache
+    for endpoint, counts in gh_client.http_cache.stats().items():
+        print(f"HTTP cache {endpoint}: {counts['hits']} hits, {counts['misses']} misses")
+    gh_client.http_cache.evict()
+    for resource, tokens in gh_client.scheduler.headroom().items():
+        for label, budget in tokens.items():
+            print(f"Rate limit {resource} {label}: {budget['remaining']}/{budget['limit']} remaining")
+    if gh_client.scheduler.throttled_seconds:
+        print(f"Throttled for {gh_client.scheduler.throttled_seconds:.0f}s to stay within rate limits")
+    
+    # 7. Run report: stage and per-repo timings, API call counters, rate limits, cache stats
+    metrics.stage(None)
+    report = metrics.report(
+        date=today_str,
+        trending=len(trending_repos),
+        persisted=len(processed_repos),
+        rate_limits=gh_client.scheduler.headroom(),
+        throttled_seconds=round(gh_client.scheduler.throttled_seconds, 3),
+        http_cache=gh_client.http_cache.stats()
+    )
+    for name, span in report["spans"].items():
+        if name.startswith("stage."):
+            print(f"{name[len('stage.'):]:<14} {span['seconds']:8.2f}s")
+    storage.upload_json(runs_key(today_str), report)
+    
+    # 8. Change manifest: what this run wrote, and the current version of the entry points
+    latest = {"daily": daily_key(today_str), "index": INDEX_MANIFEST_KEY, "report": runs_key(today_str)}
+    latest.update({name: rollup_key(name, today_str) for name in ROLLUP_WINDOWS})
+    publish_changes(storage, today_str, latest)
+    storage.save_manifest()
+    llm_client.tag_cache.save()
     
     print("Done!")
 
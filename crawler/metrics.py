@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+
+def runs_key(date_str, kind=None):
+    """Run report key: data/runs/<date>.json, or data/runs/<date>-<kind>.json for other entry points."""
+    return f"data/runs/{date_str}-{kind}.json" if kind else f"data/runs/{date_str}.json"
+
+
+class RunMetrics:
+    """
+    Timings and counters of one crawl run, shared by all crawler threads.
+
+    stage() marks where the next pipeline stage starts, span() times a block (and, given
+    a repo, that repo's share of it) and count() adds to a named counter such as API
+    calls, retries, backoff seconds or LLM tokens.
+    report() collects everything into the JSON written to data/runs/<date>.json.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = datetime.now(timezone.utc)
+            self._started = time.perf_counter()
+            self.spans = {}
+            self.counters = Counter()
+            self.repos = {}
+            self._stage = (None, 0.0)
+
+    def stage(self, name):
+        """Ends the current pipeline stage, if any, and starts the named one (None only ends it)."""
+        now = time.perf_counter()
+        with self._lock:
+            previous, started = self._stage
+            self._stage = (name, now)
+        if previous:
+            self.add_time(f"stage.{previous}", now - started)
+
+    @contextmanager
+    def span(self, name, repo=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start, repo)
+
+    def add_time(self, name, seconds, repo=None):
+        with self._lock:
+            span = self.spans.setdefault(name, {"count": 0, "seconds": 0.0, "max_seconds": 0.0})
+            span["count"] += 1
+            span["seconds"] += seconds
+            span["max_seconds"] = max(span["max_seconds"], seconds)
+            if repo:
+                timings = self.repos.setdefault(repo, {})
+                timings[name] = timings.get(name, 0.0) + seconds
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] += value
+
+    def report(self, **sections):
+        """The run report; sections (rate limits, cache stats, ...) are added as they are."""
+        with self._lock:
+            report = {
+                "started_at": self.started_at.isoformat(),
+                "wall_seconds": round(time.perf_counter() - self._started, 3),
+                "spans": {
+                    name: dict(span, seconds=round(span["seconds"], 3), max_seconds=round(span["max_seconds"], 3))
+                    for name, span in self.spans.items()
+                },
+                "counters": {
+                    name: round(value, 3) if isinstance(value, float) else value
+                    for name, value in sorted(self.counters.items())
+                },
+                "repos": {
+                    repo: {name: round(seconds, 3) for name, seconds in timings.items()}
+                    for repo, timings in sorted(self.repos.items())
+                },
+            }
+        report.update(sections)
+        return report
+
+
+# Process-wide instance, like logging's root logger; main() resets it at the start of a run
+metrics = RunMetrics()
@@ -0,0 +1,62 @@
+"""
+Change manifests for clients of the static data bucket.
+
+data/changes/<date>.json lists every object written on that date with its content hash
+and a versioned URL (<key>?v=<hash prefix>); data/manifest.json points at the latest
+daily file, rollups, index manifest and run report, and at the recent change lists.
+A client that remembers its last visit downloads only the objects changed since then,
+and can cache versioned URLs forever.
+"""
+from .backends import BACKEND_ERRORS
+
+DATA_MANIFEST_KEY = "data/manifest.json"
+# Change lists kept in data/manifest.json
+RECENT_CHANGES = 30
+VERSION_LENGTH = 16
+# Crawler bookkeeping that clients never read
+UNPUBLISHED_PREFIXES = ("data/journal/",)
+
+
+def changes_key(date_str):
+    return f"data/changes/{date_str}.json"
+
+
+def versioned_url(key, digest):
+    return f"{key}?v={digest[:VERSION_LENGTH]}"
+
+
+def publish_changes(storage, date_str, latest=None):
+    """
+    Publishes the objects storage wrote in this run into the date's change list (merged
+    with earlier runs of the same date) and updates data/manifest.json.
+    latest: name -> key of objects to advertise as the current version (e.g. "daily").
+    Returns the manifest, or None when the published files could not be read.
+    """
+    key = changes_key(date_str)
+    changed = {
+        object_key: digest for object_key, digest in storage.changed_objects().items()
+        if not object_key.startswith(UNPUBLISHED_PREFIXES)
+    }
+    try:
+        changes = storage.read_json(key) or {"date": date_str, "objects": {}}
+        manifest = storage.read_json(DATA_MANIFEST_KEY) or {"version": 1, "latest": {}, "changes": []}
+    except (*BACKEND_ERRORS, ValueError) as e:
+        # Publishing over a manifest or change list we could not read would drop its entries
+        print(f"Error reading published manifests, skipping publish: {e}")
+        return None
+    for object_key, digest in changed.items():
+        changes["objects"][object_key] = {"hash": digest, "url": versioned_url(object_key, digest)}
+    changes["objects"] = dict(sorted(changes["objects"].items()))
+    storage.upload_json(key, changes)
+
+    for name, object_key in (latest or {}).items():
+        digest = storage.object_hash(object_key)
+        if digest:
+            manifest["latest"][name] = {"key": object_key, "hash": digest, "url": versioned_url(object_key, digest)}
+    recent = [entry for entry in manifest["changes"] if entry["date"] != date_str]
+    recent.append({"date": date_str, "key": key, "count": len(changes["objects"])})
+    manifest["changes"] = sorted(recent, key=lambda entry: entry["date"])[-RECENT_CHANGES:]
+    manifest["updated"] = date_str
+    storage.upload_json(DATA_MANIFEST_KEY, manifest)
+    print(f"Published {len(changed)} changed objects to {key}.")
+    return manifest
@@ -0,0 +1,39 @@
+"""
+Star-growth queries against a SQLite store (STORAGE_BACKEND=sqlite:<path>).
+
+    python -m crawler.query [--tag TAG] [--days 30] [--limit 20] [--date YYYY-MM-DD] [--db PATH] [--json]
+
+Lists the repos that gained the most stars over the window, optionally only those with
+the given tag, from the indexed star history instead of the project JSON files.
+"""
+import argparse
+import json
+from .backends import SQLiteBackend
+from .config import Config
+
+
+def default_db():
+    kind, _, location = Config.STORAGE_BACKEND.partition(":")
+    return location if kind == "sqlite" else None
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--tag")
+    arg_parser.add_argument("--days", type=int, default=30)
+    arg_parser.add_argument("--limit", type=int, default=20)
+    arg_parser.add_argument("--date", help="last day of the window (default today)")
+    arg_parser.add_argument("--db", default=default_db(), help="SQLite file (default from STORAGE_BACKEND)")
+    arg_parser.add_argument("--json", action="store_true", help="print the rows as JSON")
+    args = arg_parser.parse_args()
+    if not args.db:
+        arg_parser.error("no SQLite store: pass --db or set STORAGE_BACKEND=sqlite:<path>")
+
+    backend = SQLiteBackend(args.db)
+    rows = backend.top_growth(tag=args.tag, days=args.days, limit=args.limit, end_date=args.date)
+    backend.close()
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+    else:
+        for rank, row in enumerate(rows, 1):
+            print(f"{rank:>3}. {row['full_name']:<45} +{row['growth']:<8} {row['stars']} stars  {row['language'] or ''}")
@@ -0,0 +1,156 @@
+import threading
+import time
+from .config import Config
+
+# Primary rate limits per hour (search: per minute) used until the first response reports them
+DEFAULT_LIMITS = {"core": 5000, "graphql": 5000, "search": 30}
+ANONYMOUS_LIMITS = {"core": 60, "graphql": 0, "search": 10}
+
+
+def header(headers, name):
+    """Case-insensitive header lookup on a plain dict."""
+    if not headers:
+        return None
+    lower = name.lower()
+    for key, value in headers.items():
+        if key.lower() == lower:
+            return value
+    return None
+
+
+class TokenBucket:
+    """Known budget of one token for one resource (core, graphql, search)."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.remaining = limit
+        self.reset = 0
+        self.in_flight = 0
+
+    def available(self, now):
+        if self.reset and now >= self.reset:
+            # Window rolled over; the next response will report the real numbers
+            self.remaining = self.limit
+            self.reset = 0
+        return self.remaining - self.in_flight
+
+
+class RateLimitScheduler:
+    """
+    Shares GitHub rate-limit budgets between all crawler threads.
+
+    Every response's X-RateLimit-* headers update the bucket of the token and resource
+    that made it. acquire() hands out the token with the most headroom, keeps a small
+    reserve untouched, paces requests once a bucket runs low, and blocks until the
+    earliest reset when every token is exhausted, instead of letting requests fail.
+    """
+
+    def __init__(self, tokens=None, reserve=None, pace_below=None):
+        tokens = list(tokens if tokens is not None else Config.GITHUB_TOKENS)
+        self.authenticated = bool(tokens)
+        # None stands for unauthenticated requests
+        self.tokens = tokens or [None]
+        limits = DEFAULT_LIMITS if self.authenticated else ANONYMOUS_LIMITS
+        self.buckets = {
+            (token, resource): TokenBucket(limit)
+            for token in self.tokens
+            for resource, limit in limits.items()
+        }
+        self.reserve = Config.RATE_LIMIT_RESERVE if reserve is None else reserve
+        self.pace_below = Config.RATE_LIMIT_PACE_BELOW if pace_below is None else pace_below
+        self.throttled_seconds = 0.0
+        self._last_grant = {}
+        self._condition = threading.Condition()
+
+    def _reserve_for(self, bucket):
+        # Small (anonymous) limits keep a proportionally smaller reserve
+        return min(self.reserve, bucket.limit // 10)
+
+    def acquire(self, resource="core"):
+        """Reserves one request on the best token for resource and returns that token."""
+        with self._condition:
+            while True:
+                now = time.time()
+                candidates = []
+                for i, token in enumerate(self.tokens):
+                    bucket = self.buckets[(token, resource)]
+                    candidates.append((bucket.available(now) - self._reserve_for(bucket), i, token))
+                headroom, _, token = max(candidates)
+                if headroom > 0:
+                    bucket = self.buckets[(token, resource)]
+                    delay = self._pacing_delay(token, resource, bucket, headroom, now)
+                    if delay <= 0:
+                        bucket.in_flight += 1
+                        self._last_grant[(token, resource)] = now
+                        return token
+                else:
+                    resets = [
+                        self.buckets[(t, resource)].reset for t in self.tokens
+                        if self.buckets[(t, resource)].reset
+                    ]
+                    if not resets:
+                        raise RuntimeError(f"No GitHub rate-limit budget for {resource}")
+                    delay = max(0, min(resets) - now) + 1
+                    print(f"Rate limit exhausted for {resource} on all {len(self.tokens)} tokens, waiting {delay:.0f}s")
+                started = time.time()
+                self._condition.wait(delay)
+                self.throttled_seconds += time.time() - started
+
+    def _pacing_delay(self, token, resource, bucket, headroom, now):
+        # Below pace_below of the limit, spread the remaining budget evenly until the reset
+        if not bucket.reset or headroom > bucket.limit * self.pace_below:
+            return 0
+        interval = max(0, bucket.reset - now) / headroom
+        last = self._last_grant.get((token, resource), 0)
+        return last + interval - now
+
+    def release(self, token, resource="core", headers=None):
+        """Returns a reservation and records the budget reported by the response headers."""
+        with self._condition:
+            reported = header(headers, "X-RateLimit-Resource") or resource
+            bucket = self.buckets.get((token, reported)) or self.buckets[(token, resource)]
+            if reported == resource:
+                bucket.in_flight = max(0, bucket.in_flight - 1)
+            else:
+                reserved = self.buckets[(token, resource)]
+                reserved.in_flight = max(0, reserved.in_flight - 1)
+            remaining = header(headers, "X-RateLimit-Remaining")
+            if remaining is not None:
+                try:
+                    bucket.limit = int(header(headers, "X-RateLimit-Limit") or bucket.limit)
+                    reset = int(header(headers, "X-RateLimit-Reset") or 0)
+                    remaining = int(remaining)
+                except ValueError:
+                    reset = None
+                if reset is not None:
+                    if reset != bucket.reset:
+                        bucket.remaining = remaining
+                        bucket.reset = reset
+                    else:
+                        # Responses can arrive out of order; the lowest count is the latest
+                        bucket.remaining = min(bucket.remaining, remaining)
+            self._condition.notify_all()
+
+    def budget(self, resource="core"):
+        """Requests still available for resource across all tokens, keeping the reserve."""
+        with self._condition:
+            now = time.time()
+            return sum(
+                max(0, bucket.available(now) - self._reserve_for(bucket))
+                for (token, bucket_resource), bucket in self.buckets.items()
+                if bucket_resource == resource
+            )
+
+    def headroom(self):
+        """Remaining budget per resource and token (tokens shown by their last 4 characters)."""
+        with self._condition:
+            now = time.time()
+            report = {}
+            for (token, resource), bucket in self.buckets.items():
+                label = f"...{token[-4:]}" if token else "anonymous"
+                report.setdefault(resource, {})[label] = {
+                    "remaining": bucket.available(now),
+                    "limit": bucket.limit,
+                    "reset": bucket.reset
+                }
+            return report
@@ -0,0 +1,72 @@
+"""
+README bodies stored outside the project records.
+
+Each README is a gzip-compressed, content-addressed object, data/readmes/<sha256>.md.gz
+(served with Content-Encoding: gzip, so browsers receive plain Markdown). The project
+record keeps only readme_ref (the object key) and a short plain-text readme_excerpt.
+An unchanged README maps to the same key and is never uploaded twice.
+"""
+import gzip
+import hashlib
+import re
+
+README_EXCERPT_CHARS = 400
+
+_IMAGES = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_LINKS = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_TAGS = re.compile(r"<[^>]+>")
+_MARKUP = re.compile(r"[#>*_`|]+")
+
+
+def readme_key(digest):
+    return f"data/readmes/{digest}.md.gz"
+
+
+def excerpt(text, limit=README_EXCERPT_CHARS):
+    """Leading text of a README without images, badges, HTML or Markdown markup."""
+    text = _TAGS.sub(" ", _IMAGES.sub(" ", text))
+    text = _MARKUP.sub(" ", _LINKS.sub(r"\1", text))
+    text = " ".join(text.split())
+    if len(text) <= limit:
+        return text
+    cut = text[:limit].rsplit(" ", 1)[0]
+    return cut + "…"
+
+
+def store_readme(storage, repo_data):
+    """
+    Uploads repo_data['readme'] as a blob (unless already stored) and sets readme_ref and
+    readme_excerpt. The text itself stays in repo_data for tagging; split_readme drops it.
+    Returns True if a blob was uploaded; on upload errors the README is left inline.
+    """
+    text = repo_data.get('readme')
+    if text is None:
+        return False
+    if not text:
+        repo_data['readme_ref'] = None
+        repo_data['readme_excerpt'] = ""
+        return False
+    body = text.encode('utf-8')
+    key = readme_key(hashlib.sha256(body).hexdigest())
+    try:
+        uploaded = storage.put_blob(
+            key,
+            gzip.compress(body, mtime=0),
+            content_type="text/markdown; charset=utf-8",
+            content_encoding="gzip"
+        )
+    except Exception as e:
+        print(f"Error uploading README {key}: {e}")
+        return False
+    repo_data['readme_ref'] = key
+    repo_data['readme_excerpt'] = excerpt(text)
+    return uploaded
+
+
+def split_readme(storage, repo_data):
+    """Moves the README out of a project record (new, or stored in the old inline format)."""
+    if 'readme' in repo_data:
+        store_readme(storage, repo_data)
+        if 'readme_ref' in repo_data:
+            del repo_data['readme']
+    return repo_data
@@ -0,0 +1,168 @@
+"""
+Refreshes star counts across the whole tracked universe, not just today's trending repos.
+
+    python -m crawler.refresh [--max-repos N]
+
+Repos from the index are queued by priority (days since their last update, recent growth
+and star count) and refreshed in batched star-count queries while the GitHub rate budget
+lasts. History points are appended only for repos whose star count changed; every
+refreshed repo gets its index entry updated.
+"""
+import argparse
+import datetime
+import heapq
+import math
+from . import history as star_history
+from .config import Config
+from .github_client import GitHubClient
+from .index import INDEX_MANIFEST_KEY, ShardedIndex
+from .main import project_key
+from .metrics import metrics, runs_key
+from .publish import publish_changes
+from .storage import Storage
+
+# Staleness assumed for entries with no recorded update date
+UNKNOWN_STALENESS_DAYS = 365
+
+
+def last_updated(entry):
+    """Date of the entry's last update: trending appearance or refresh, whichever is later."""
+    dates = [entry[field] for field in ("last_seen", "refreshed") if entry.get(field)]
+    return max(dates)[:10] if dates else None
+
+
+def priority(entry, today):
+    """
+    Refresh priority: staleness in days, weighted up by recent growth and star count
+    (log-scaled, so popularity breaks ties but never starves small repos). None if
+    the entry was already updated today.
+    """
+    updated = last_updated(entry)
+    staleness = (today - datetime.date.fromisoformat(updated)).days if updated else UNKNOWN_STALENESS_DAYS
+    if staleness <= 0:
+        return None
+    growth = max(0, entry.get('growth_per_day') or 0)
+    stars = max(0, entry.get('stars') or 0)
+    return staleness * (1 + math.log10(1 + growth)) * (1 + math.log10(1 + stars))
+
+
+def refresh_queue(entries, today):
+    """Heap of (-priority, position, entry) for every entry that is due a refresh."""
+    queue = []
+    for position, entry in enumerate(entries):
+        score = priority(entry, today)
+        if score is not None:
+            queue.append((-score, position, entry))
+    heapq.heapify(queue)
+    return queue
+
+
+def update_records(storage, changed, today_str):
+    """Appends today's point to the stored history of repos whose star count changed."""
+    def modify(record, change):
+        entry, counts = change
+        if not record:
+            print(f"No project record for {entry['owner']}/{entry['repo']}; index entry only.")
+            return None
+        history = star_history.expand(record.get('star_history'))
+        star_history.append_point(history, today_str, counts['stars'])
+        record['stargazers_count'] = counts['stars']
+        record['forks_count'] = counts['forks']
+        record['updated_at'] = datetime.datetime.now().isoformat()
+        return record, history
+
+    return storage.update_projects({
+        project_key(entry['owner'], entry['repo']): (entry['owner'], entry['repo'], (entry, counts))
+        for entry, counts in changed
+    }, modify)
+
+def main(storage=None, gh_client=None, today_str=None, max_repos=None):
+    print("Starting refresh of tracked repos...")
+    metrics.reset()
+
+    storage = storage or Storage()
+    gh_client = gh_client or GitHubClient()
+    today_str = today_str or datetime.datetime.now().strftime('%Y-%m-%d')
+    today = datetime.date.fromisoformat(today_str)
+    max_repos = max_repos or Config.REFRESH_MAX_REPOS
+    batch_size = Config.REFRESH_BATCH_SIZE
+
+    metrics.stage("load_index")
+    index = ShardedIndex(storage)
+    entries = index.load_all()
+    queue = refresh_queue(entries, today)
+    print(f"{len(queue)} of {len(entries)} tracked repos are due a refresh.")
+
+    # Batched GraphQL queries cost one point per batch; without a token every repo is a REST call
+    metrics.stage("counts")
+    resource = "graphql" if gh_client.scheduler.authenticated else "core"
+    repos_per_request = batch_size if resource == "graphql" else 1
+    refreshed = []
+    changed = []
+    failed = 0
+    while queue and len(refreshed) + failed < max_repos:
+        requests_left = gh_client.scheduler.budget(resource)
+        if requests_left <= 0:
+            print("Rate budget used up; the remaining repos wait for the next run.")
+            break
+        size = min(batch_size, requests_left * repos_per_request, max_repos - len(refreshed) - failed)
+        batch = [heapq.heappop(queue)[2] for _ in range(min(size, len(queue)))]
+        counts = gh_client.get_star_counts(
+            ((entry['owner'], entry['repo']) for entry in batch),
+            batch_size=batch_size
+        )
+        for entry in batch:
+            current = counts.get((entry['owner'], entry['repo']))
+            if current is None:
+                failed += 1
+                continue
+            updated = last_updated(entry)
+            days = (today - datetime.date.fromisoformat(updated)).days if updated else UNKNOWN_STALENESS_DAYS
+            delta = current['stars'] - (entry.get('stars') or 0)
+            refreshed_entry = dict(
+                entry,
+                stars=current['stars'],
+                growth_per_day=round(max(0, delta) / max(1, days), 1),
+                refreshed=today_str
+            )
+            refreshed.append(refreshed_entry)
+            if delta:
+                changed.append((refreshed_entry, current))
+    metrics.count("refresh.refreshed", len(refreshed))
+    metrics.count("refresh.changed", len(changed))
+    metrics.count("refresh.failed", failed)
+
+    metrics.stage("records")
+    updated_records = update_records(storage, changed, today_str) if changed else 0
+
+    metrics.stage("index")
+    if refreshed:
+        changed_shards = index.update(refreshed, updated=today_str)
+        print(f"Updated {len(changed_shards)} index shards.")
+
+    metrics.stage(None)
+    print(
+        f"Refreshed {len(refreshed)} repos: {len(changed)} with new star counts "
+        f"({updated_records} histories extended), {failed} failed, {len(queue)} still due."
+    )
+    report = metrics.report(
+        date=today_str,
+        tracked=len(entries),
+        refreshed=len(refreshed),
+        changed=len(changed),
+        failed=failed,
+        still_due=len(queue),
+        rate_limits=gh_client.scheduler.headroom(),
+        throttled_seconds=round(gh_client.scheduler.throttled_seconds, 3)
+    )
+    storage.upload_json(runs_key(today_str, "refresh"), report)
+    publish_changes(storage, today_str, {"index": INDEX_MANIFEST_KEY, "refresh_report": runs_key(today_str, "refresh")})
+    storage.save_manifest()
+    print("Done!")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--max-repos", type=int, help=f"default REFRESH_MAX_REPOS ({Config.REFRESH_MAX_REPOS})")
+    args = arg_parser.parse_args()
+    main(max_repos=args.max_repos)
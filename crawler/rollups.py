@@ -0,0 +1,117 @@
+"""
+Rolling weekly and monthly aggregates of the daily trending snapshots.
+
+Each rollup (data/weekly/<date>.json, data/monthly/<date>.json) lists the repos that
+trended within its window, ranked by cumulative star growth, with their days on
+trending and rank change since the previous day's rollup. Every repo keeps its
+per-day figures, so the next rollup is built from this one plus the new snapshot:
+days that left the window are dropped instead of re-reading every daily file.
+"""
+import datetime
+from .trending import growth_per_day
+
+# Rollup name -> window length in days
+ROLLUP_WINDOWS = {"weekly": 7, "monthly": 30}
+
+
+def daily_key(date_str):
+    return f"data/daily/{date_str}.json"
+
+
+def rollup_key(name, date_str):
+    return f"data/{name}/{date_str}.json"
+
+
+def _shift(date_str, days):
+    return (datetime.date.fromisoformat(date_str) + datetime.timedelta(days=days)).isoformat()
+
+
+def update_rollup(previous, snapshot, date_str, window, name=None):
+    """
+    The rollup for date_str from the previous one (None to start empty) and that day's
+    daily snapshot: expired days are dropped, the snapshot's day is added (repos on that
+    day's daily trending page only, ranked by their position there), and growth, days on
+    trending and ranks are recomputed from the per-day figures.
+    """
+    start = _shift(date_str, -(window - 1))
+    previous_ranks = {}
+    repos = {}
+    for entry in (previous or {}).get("repos", []):
+        full_name = f"{entry['owner']}/{entry['repo']}"
+        previous_ranks[full_name] = entry["rank"]
+        days = {day: figures for day, figures in entry["days"].items() if start <= day < date_str}
+        if days:
+            repos[full_name] = dict(entry, days=days)
+
+    # Repos only on the weekly/monthly (or language) pages didn't trend that day; entries
+    # of daily files from before multi-range scraping have no ranges and are all daily
+    daily = [item for item in snapshot if "daily" in (item.get('ranges') or ["daily"])]
+    for position, item in enumerate(daily, 1):
+        full_name = f"{item['owner']}/{item['repo']}"
+        entry = repos.setdefault(full_name, {"owner": item['owner'], "repo": item['repo'], "days": {}})
+        # Metadata follows the latest snapshot
+        entry.update(
+            description=item.get('description'),
+            language=item.get('language'),
+            stars=item.get('stars'),
+            forks=item.get('forks'),
+            tags=item.get('tags', [])
+        )
+        entry["days"][date_str] = {
+            "stars": item.get('stars') or 0,
+            "growth": growth_per_day(item.get('growth_by_range') or {"daily": item.get('growth') or 0}),
+            "rank": position
+        }
+
+    for entry in repos.values():
+        days = sorted(entry["days"])
+        first, last = entry["days"][days[0]], entry["days"][days[-1]]
+        # Stars gained between the first and last appearance, plus the first day's own growth
+        entry["growth"] = round(max(0, last["stars"] - first["stars"]) + first["growth"])
+        entry["days_on_trending"] = len(days)
+        entry["best_rank"] = min(figures["rank"] for figures in entry["days"].values())
+        entry["days"] = {day: entry["days"][day] for day in days}
+
+    ranked = sorted(
+        repos.values(),
+        key=lambda entry: (-entry["growth"], -entry["days_on_trending"], entry["owner"], entry["repo"])
+    )
+    for rank, entry in enumerate(ranked, 1):
+        previous_rank = previous_ranks.get(f"{entry['owner']}/{entry['repo']}")
+        entry["rank"] = rank
+        entry["previous_rank"] = previous_rank
+        # Positive when the repo moved up
+        entry["rank_change"] = previous_rank - rank if previous_rank else None
+    return {"range": name, "window": window, "date": date_str, "start": start, "repos": ranked}
+
+
+def rebuild_rollup(storage, name, window, date_str):
+    """Builds the rollup for date_str from the daily files in its window (no previous rollup)."""
+    dates = [_shift(date_str, -offset) for offset in range(window - 1, -1, -1)]
+    snapshots, _ = storage.get_many(daily_key(day) for day in dates)
+    found = [day for day in dates if snapshots.get(daily_key(day))]
+    if found:
+        print(f"Rebuilding {name} rollup for {date_str} from {len(found)} daily files...")
+    rollup = None
+    for day in found:
+        rollup = update_rollup(rollup, snapshots[daily_key(day)], day, window, name)
+    return rollup
+
+
+def update_rollups(storage, date_str, snapshot, windows=None):
+    """Publishes every rollup for date_str from the previous day's rollup and today's snapshot."""
+    windows = windows or ROLLUP_WINDOWS
+    yesterday = _shift(date_str, -1)
+    previous, errors = storage.get_many(rollup_key(name, yesterday) for name in windows)
+    rollups = {}
+    for name, window in windows.items():
+        key = rollup_key(name, yesterday)
+        rollup = previous.get(key)
+        if rollup is None or rollup.get("window") != window:
+            # First run, a missed day or a changed window: start from the daily files
+            rollup = rebuild_rollup(storage, name, window, yesterday)
+        rollups[rollup_key(name, date_str)] = update_rollup(rollup, snapshot, date_str, window, name)
+    _, errors = storage.put_many(rollups)
+    for key, error in errors.items():
+        print(f"Error writing rollup {key}: {error}")
+    return rollups
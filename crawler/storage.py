@@ -1,51 +1,315 @@
+import gzip
+import hashlib
 import json
-import boto3
-from botocore.exceptions import ClientError
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from . import history as star_history
+from .backends import BACKEND_ERRORS, open_backend
 from .config import Config
+from .metrics import metrics
+from .readmes import split_readme
+
+# Top-level fields that change on every write without changing the content
+VOLATILE_FIELDS = {"updated_at"}
+
+# Cache-Control by key prefix, first match wins. Only content-addressed objects are
+# immutable: dated snapshots can still be rewritten (a resumed run, a retry that adds
+# skipped repos, backfill --force), so they are revalidated after an hour. Clients cache
+# longer through the versioned ?v=<hash> URLs in the manifests (see crawler/publish.py).
+IMMUTABLE = "public, max-age=31536000, immutable"
+DATED_CACHE_CONTROL = "public, max-age=3600"
+CACHE_CONTROL_RULES = [
+    ("data/readmes/", IMMUTABLE),
+    ("data/daily/", DATED_CACHE_CONTROL),
+    ("data/weekly/", DATED_CACHE_CONTROL),
+    ("data/monthly/", DATED_CACHE_CONTROL),
+    ("data/manifest.json", "public, max-age=60"),
+    ("data/index/manifest.json", "public, max-age=60"),
+]
+DEFAULT_CACHE_CONTROL = "public, max-age=300"
+
+
+def cache_control(key):
+    return next((value for prefix, value in CACHE_CONTROL_RULES if key.startswith(prefix)), DEFAULT_CACHE_CONTROL)
+
+
+def content_hash(data):
+    """Hash of the canonical JSON payload, ignoring volatile fields."""
+    if isinstance(data, dict):
+        data = {k: v for k, v in data.items() if k not in VOLATILE_FIELDS}
+    canonical = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
 
 class Storage:
-    def __init__(self):
-        self.s3 = boto3.client(
-            's3',
-            endpoint_url=Config.S3_ENDPOINT_URL,
-            aws_access_key_id=Config.S3_ACCESS_KEY_ID,
-            aws_secret_access_key=Config.S3_SECRET_ACCESS_KEY,
-            region_name=Config.S3_REGION_NAME
-        )
-        self.bucket = Config.S3_BUCKET_NAME
+    def __init__(self, backend=None):
+        # STORAGE_BACKEND (s3, local:<dir> or sqlite:<path>) unless a backend is given
+        self.backend = backend or open_backend()
+        self.bucket = self.backend.location
+        self.encoding = Config.JSON_ENCODING
+        self.manifest_path = Config.STORAGE_MANIFEST_PATH
+        self._manifest_lock = threading.Lock()
+        self.manifest = self._load_manifest()
+        # Objects written by this process: key -> content hash
+        self.changes = {}
 
-    def upload_json(self, key, data):
-        """Uploads a dictionary as a JSON file to S3."""
+    def _load_manifest(self):
+        """Local record of key -> {hash, etag, encoding} for objects this crawler wrote or read."""
         try:
-            json_str = json.dumps(data, ensure_ascii=False, indent=2)
-            self.s3.put_object(
-                Bucket=self.bucket,
-                Key=key,
-                Body=json_str.encode('utf-8'),
-                ContentType='application/json'
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get("bucket") == self.bucket:
+                return manifest.get("objects", {})
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def save_manifest(self):
+        with self._manifest_lock:
+            payload = {"bucket": self.bucket, "objects": dict(self.manifest)}
+        try:
+            os.makedirs(os.path.dirname(self.manifest_path) or '.', exist_ok=True)
+            tmp_path = f"{self.manifest_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self.manifest_path)
+        except OSError as e:
+            print(f"Error saving storage manifest: {e}")
+
+    def _remember(self, key, digest, etag, encoding):
+        with self._manifest_lock:
+            self.manifest[key] = {"hash": digest, "etag": etag, "encoding": encoding}
+
+    def object_hash(self, key):
+        """Content hash of a stored object (None if unknown)."""
+        return self._stored_hash(key)[0]
+
+    def exists(self, key):
+        """Whether the object exists, whatever metadata it carries (errors raise)."""
+        with self._manifest_lock:
+            if key in self.manifest:
+                return True
+        metrics.count("s3.head")
+        with metrics.span("s3.head"):
+            return self.backend.head(key) is not None
+
+    def changed_objects(self):
+        """Key -> content hash of every object written since this Storage was created."""
+        with self._manifest_lock:
+            return dict(self.changes)
+
+    def _stored_hash(self, key):
+        """Content hash of the stored object, from the manifest or the object's metadata."""
+        with self._manifest_lock:
+            entry = self.manifest.get(key)
+        if entry:
+            return entry["hash"], entry.get("encoding")
+        metrics.count("s3.head")
+        try:
+            with metrics.span("s3.head"):
+                response = self.backend.head(key)
+        except BACKEND_ERRORS:
+            return None, None
+        if response is None:
+            return None, None
+        digest = response["metadata"].get('content-sha256')
+        encoding = response["metadata"].get('json-encoding')
+        if digest:
+            self._remember(key, digest, response["etag"], encoding)
+        return digest, encoding
+
+    def _encode(self, data):
+        """Serializes data per Config.JSON_ENCODING; returns (body, content encoding)."""
+        if self.encoding == 'pretty':
+            return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8'), None
+        body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        if self.encoding == 'gzip':
+            return gzip.compress(body, mtime=0), "gzip"
+        return body, None
+
+    def _write_json(self, key, data, force=False):
+        """Uploads data unless unchanged; returns True if written. Errors raise."""
+        digest = content_hash(data)
+        if not force:
+            stored_digest, stored_encoding = self._stored_hash(key)
+            if stored_digest == digest and stored_encoding == self.encoding:
+                print(f"Skipped {key} (unchanged)")
+                metrics.count("s3.put_skipped")
+                return False
+        body, content_encoding = self._encode(data)
+        metrics.count("s3.put")
+        metrics.count("s3.bytes_uploaded", len(body))
+        with metrics.span("s3.put"):
+            etag = self.backend.put(
+                key,
+                body,
+                'application/json',
+                cache_control=cache_control(key),
+                metadata={"content-sha256": digest, "json-encoding": self.encoding},
+                content_encoding=content_encoding
+            )
+        self._remember(key, digest, etag, self.encoding)
+        with self._manifest_lock:
+            self.changes[key] = digest
+        print(f"Successfully uploaded {key} to {self.bucket}")
+        return True
+
+    def put_blob(self, key, body, content_type, content_encoding=None):
+        """
+        Uploads an immutable, content-addressed object unless it already exists.
+        Returns True if written. Errors raise.
+        """
+        with self._manifest_lock:
+            if key in self.manifest:
+                metrics.count("s3.blob_skipped")
+                return False
+        digest = hashlib.sha256(body).hexdigest()
+        metrics.count("s3.head")
+        response = self.backend.head(key)
+        if response is not None:
+            self._remember(key, digest, response["etag"], None)
+            metrics.count("s3.blob_skipped")
+            return False
+        metrics.count("s3.put")
+        metrics.count("s3.bytes_uploaded", len(body))
+        with metrics.span("s3.put"):
+            etag = self.backend.put(
+                key,
+                body,
+                content_type,
+                cache_control=cache_control(key),
+                content_encoding=content_encoding
             )
-            print(f"Successfully uploaded {key} to {self.bucket}")
-        except ClientError as e:
+        self._remember(key, digest, etag, None)
+        with self._manifest_lock:
+            self.changes[key] = digest
+        print(f"Successfully uploaded {key} to {self.bucket}")
+        return True
+
+    def upload_json(self, key, data, force=False):
+        """
+        Uploads a dictionary as a JSON file.
+        The PUT is skipped when the stored object already has the same content hash.
+        Returns True if the object was written.
+        """
+        try:
+            return self._write_json(key, data, force)
+        except BACKEND_ERRORS as e:
             print(f"Error uploading {key}: {e}")
+            return False
+
+    def _read_json(self, key):
+        """Retrieves a JSON file; missing keys return None, other errors raise."""
+        metrics.count("s3.get")
+        with metrics.span("s3.get"):
+            response = self.backend.get(key)
+        if response is None:
+            return None
+        body = response["body"]
+        metrics.count("s3.bytes_downloaded", len(body))
+        if response["content_encoding"] == 'gzip':
+            body = gzip.decompress(body)
+        data = json.loads(body.decode('utf-8'))
+        metadata = response["metadata"]
+        self._remember(
+            key,
+            metadata.get('content-sha256') or content_hash(data),
+            response["etag"],
+            metadata.get('json-encoding')
+        )
+        return data
+
+    def read_json(self, key):
+        """Retrieves a JSON file; None only if it does not exist, read errors raise."""
+        return self._read_json(key)
 
     def get_json(self, key):
-        """Retrieves a JSON file from S3."""
+        """Retrieves a JSON file (None if missing or unreadable)."""
         try:
-            response = self.s3.get_object(Bucket=self.bucket, Key=key)
-            return json.loads(response['Body'].read().decode('utf-8'))
-        except ClientError as e:
-            if e.response['Error']['Code'] == 'NoSuchKey':
-                return None
+            return self._read_json(key)
+        except BACKEND_ERRORS as e:
             print(f"Error getting {key}: {e}")
             return None
 
+    def get_many(self, keys, workers=None):
+        """
+        Retrieves many JSON files concurrently.
+        Returns (results, errors): results maps every key to its data (None if missing
+        or failed), errors maps the keys that failed to the exception raised.
+        """
+        keys = list(dict.fromkeys(keys))
+        results = {}
+        errors = {}
+
+        def fetch(key):
+            try:
+                return key, self._read_json(key), None
+            except Exception as e:
+                return key, None, e
+
+        with ThreadPoolExecutor(max_workers=workers or Config.S3_CONCURRENCY) as executor:
+            for key, data, error in executor.map(fetch, keys):
+                results[key] = data
+                if error is not None:
+                    print(f"Error getting {key}: {error}")
+                    errors[key] = error
+        return results, errors
+
+    def put_many(self, items, workers=None):
+        """
+        Uploads many JSON files concurrently. items: dict or iterable of (key, data).
+        Returns (written, errors): written maps each key to whether it was uploaded
+        (False when unchanged), errors maps the keys that failed to the exception raised.
+        """
+        items = list(items.items() if isinstance(items, dict) else items)
+        written = {}
+        errors = {}
+
+        def put(item):
+            key, data = item
+            try:
+                return key, self._write_json(key, data), None
+            except Exception as e:
+                return key, False, e
+
+        with ThreadPoolExecutor(max_workers=workers or Config.S3_CONCURRENCY) as executor:
+            for key, uploaded, error in executor.map(put, items):
+                written[key] = uploaded
+                if error is not None:
+                    print(f"Error uploading {key}: {error}")
+                    errors[key] = error
+        return written, errors
+
+    def update_projects(self, repos, modify):
+        """
+        Read-modify-write of project records and their chart histories, one get_many and
+        one put_many per batch. repos maps project keys to (owner, repo_name, item);
+        modify(record, item) gets the stored record (None if missing) and returns
+        (record, full star history) to write, or None to leave the repo alone. Repos
+        whose record can't be read are skipped. Returns the number of repos written.
+        """
+        records, errors = self.get_many(repos)
+        uploads = []
+        for key, (owner, repo_name, item) in repos.items():
+            if key in errors:
+                continue
+            updated = modify(records.get(key), item)
+            if updated is None:
+                continue
+            record, history = updated
+            record['star_history'] = star_history.compact(history)
+            uploads.append((key, split_readme(self, record)))
+            uploads.append((star_history.history_key(owner, repo_name), star_history.downsampled(history)))
+        _, put_errors = self.put_many(uploads)
+        for key, error in {**errors, **put_errors}.items():
+            print(f"Error updating {key}: {error}")
+        return len(uploads) // 2
+
     def list_files(self, prefix):
-        """Lists files in S3 with a given prefix."""
+        """Lists every key with a given prefix (all pages, not just the first 1000 keys)."""
         try:
-            response = self.s3.list_objects_v2(Bucket=self.bucket, Prefix=prefix)
-            if 'Contents' in response:
-                return [obj['Key'] for obj in response['Contents']]
-            return []
-        except ClientError as e:
+            return list(self.backend.list_keys(prefix))
+        except BACKEND_ERRORS as e:
             print(f"Error listing files with prefix {prefix}: {e}")
             return []
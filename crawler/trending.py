@@ -0,0 +1,193 @@
+"""
+GitHub trending page parsing.
+
+parse_trending_html uses lxml directly when it is installed (several times faster than
+BeautifulSoup) and falls back to BeautifulSoup's html.parser otherwise. Both backends
+produce identical rows; `python -m crawler.benchmarks.parser` compares them.
+"""
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+except ImportError: # optional dependency
+    lxml = None
+
+GROWTH_SUFFIXES = (' stars today', ' stars this week', ' stars this month')
+
+
+def _parse_count(text):
+    return int(text.replace(',', ''))
+
+
+def _parse_growth(text):
+    text = text.replace(',', '')
+    for suffix in GROWTH_SUFFIXES:
+        text = text.replace(suffix, '')
+    try:
+        return int(text)
+    except ValueError:
+        return 0
+
+
+def _row(full_name, description, language, stars, forks, growth, time_range):
+    owner, repo_name = full_name.split('/')
+    return {
+        "owner": owner,
+        "repo": repo_name,
+        "description": description,
+        "language": language,
+        "stars": stars,
+        "forks": forks,
+        "growth": growth,
+        "since": time_range
+    }
+
+
+def _parse_bs4(html, time_range):
+    soup = BeautifulSoup(html, 'html.parser')
+    repos = []
+    
+    for article in soup.select('article.Box-row'):
+        try:
+            # Get repo name (owner/repo)
+            h1 = article.select_one('h2.h3 a')
+            if not h1: continue
+            full_name = h1.get_text(strip=True).replace(' ', '')
+            
+            # Get description
+            p = article.select_one('p.col-9')
+            description = p.get_text(strip=True) if p else ""
+            
+            # Get meta info
+            div = article.select_one('div.f6')
+            
+            # Language
+            lang_span = div.select_one('span[itemprop="programmingLanguage"]')
+            language = lang_span.get_text(strip=True) if lang_span else "Unknown"
+            
+            # Stars and Forks are the muted links
+            links = div.select('a.Link--muted')
+            stars = _parse_count(links[0].get_text(strip=True)) if len(links) >= 1 else 0
+            forks = _parse_count(links[1].get_text(strip=True)) if len(links) >= 2 else 0
+                
+            # Growth (Today stars)
+            growth_span = div.select_one('span.d-inline-block.float-sm-right')
+            growth = _parse_growth(growth_span.get_text(strip=True)) if growth_span else 0
+
+            repos.append(_row(full_name, description, language, stars, forks, growth, time_range))
+        except Exception as e:
+            print(f"Error parsing repo: {e}")
+            continue
+            
+    return repos
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+_XPATH_ARTICLES = f"//article[{_has_class('Box-row')}]"
+_XPATH_NAME = f".//h2[{_has_class('h3')}]//a"
+_XPATH_DESCRIPTION = f".//p[{_has_class('col-9')}]"
+_XPATH_META = f".//div[{_has_class('f6')}]"
+_XPATH_LANGUAGE = ".//span[@itemprop='programmingLanguage']"
+_XPATH_LINKS = f".//a[{_has_class('Link--muted')}]"
+_XPATH_GROWTH = f".//span[{_has_class('d-inline-block')} and {_has_class('float-sm-right')}]"
+
+
+def _text(element):
+    # Same as BeautifulSoup's get_text(strip=True): stripped text nodes joined without separator
+    return "".join(part.strip() for part in element.itertext() if part.strip())
+
+
+def _first(element, xpath):
+    found = element.xpath(xpath)
+    return found[0] if found else None
+
+
+def _parse_lxml(html, time_range):
+    if isinstance(html, str):
+        html = html.encode('utf-8')
+    tree = lxml.html.fromstring(html)
+    repos = []
+
+    for article in tree.xpath(_XPATH_ARTICLES):
+        try:
+            h1 = _first(article, _XPATH_NAME)
+            if h1 is None: continue
+            full_name = _text(h1).replace(' ', '')
+
+            p = _first(article, _XPATH_DESCRIPTION)
+            description = _text(p) if p is not None else ""
+
+            div = _first(article, _XPATH_META)
+
+            lang_span = _first(div, _XPATH_LANGUAGE)
+            language = _text(lang_span) if lang_span is not None else "Unknown"
+
+            links = div.xpath(_XPATH_LINKS)
+            stars = _parse_count(_text(links[0])) if len(links) >= 1 else 0
+            forks = _parse_count(_text(links[1])) if len(links) >= 2 else 0
+
+            growth_span = _first(div, _XPATH_GROWTH)
+            growth = _parse_growth(_text(growth_span)) if growth_span is not None else 0
+
+            repos.append(_row(full_name, description, language, stars, forks, growth, time_range))
+        except Exception as e:
+            print(f"Error parsing repo: {e}")
+            continue
+
+    return repos
+
+
+PARSERS = {"html.parser": _parse_bs4}
+if lxml is not None:
+    PARSERS["lxml"] = _parse_lxml
+DEFAULT_PARSER = "lxml" if lxml is not None else "html.parser"
+
+
+def parse_trending_html(html, time_range='daily', parser=None):
+    """
+    Parses a GitHub trending page into repo rows.
+    time_range: 'daily', 'weekly', 'monthly' (recorded as 'since' on each row)
+    """
+    return PARSERS[parser or DEFAULT_PARSER](html, time_range)
+
+
+# Days covered by each trending range
+RANGE_DAYS = {"daily": 1, "weekly": 7, "monthly": 30}
+
+
+def growth_per_day(growth_by_range):
+    """Stars gained per day, estimated from the shortest trending range available."""
+    for time_range, days in RANGE_DAYS.items():
+        if time_range in growth_by_range:
+            return round(growth_by_range[time_range] / days, 1)
+    return 0
+
+
+def merge_trending(pages):
+    """
+    Merges rows from several trending pages, keyed by owner/repo, keeping first-seen order.
+    pages: iterable of (time_range, rows). Each merged row records the ranges it appeared
+    in and its growth per range; 'growth' prefers the daily figure.
+    """
+    merged = {}
+    for time_range, rows in pages:
+        for row in rows:
+            full_name = f"{row['owner']}/{row['repo']}"
+            entry = merged.get(full_name)
+            if entry is None:
+                entry = dict(row)
+                entry.pop("since", None)
+                entry["ranges"] = []
+                entry["growth_by_range"] = {}
+                merged[full_name] = entry
+            if time_range not in entry["ranges"]:
+                entry["ranges"].append(time_range)
+            entry["growth_by_range"].setdefault(time_range, row["growth"])
+            if entry["language"] == "Unknown" and row["language"] != "Unknown":
+                entry["language"] = row["language"]
+    for entry in merged.values():
+        entry["growth"] = entry["growth_by_range"].get("daily", entry["growth_by_range"][entry["ranges"][0]])
+    return list(merged.values())
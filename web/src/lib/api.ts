@@ -1,6 +1,59 @@
-import type { Repo, TimeRange } from '../types';
+import type { ChangeList, DataManifest, IndexManifest, Repo, Rollup, StarHistoryPoint, StarHistorySeries, TimeRange, VersionedObject } from '../types';
+import { expandStarHistory } from './history';
 
 const BASE_URL = import.meta.env.VITE_DATA_URL || 'https://pub-f31a5865021b44d0a2c4003b3da37f04.r2.dev';
+const DATA_CACHE = 'ai-trending-data';
+const VERSION_LENGTH = 16;
+
+async function openDataCache(): Promise<Cache | null> {
+  if (typeof caches === 'undefined') return null;
+  return caches.open(DATA_CACHE).catch(() => null);
+}
+
+// A versioned URL (?v=<hash>) never changes content: it is downloaded once and then
+// served from the Cache API, and older versions of the same key are dropped.
+export async function fetchVersioned<T>(key: string, hash: string): Promise<T> {
+  const url = `${BASE_URL}/${key}?v=${hash.slice(0, VERSION_LENGTH)}`;
+  const cache = await openDataCache();
+  const cached = await cache?.match(url);
+  if (cached) return cached.json();
+  const response = await fetch(url);
+  if (!response.ok) throw new Error(`Failed to fetch ${key}`);
+  if (cache) {
+    await cache.delete(`${BASE_URL}/${key}`, { ignoreSearch: true });
+    await cache.put(url, response.clone());
+  }
+  return response.json();
+}
+
+export async function fetchDataManifest(): Promise<DataManifest | null> {
+  try {
+    const response = await fetch(`${BASE_URL}/data/manifest.json`);
+    if (!response.ok) throw new Error("Failed to fetch data manifest");
+    return await response.json();
+  } catch {
+    return null;
+  }
+}
+
+// Objects written after the given date (YYYY-MM-DD), newest version of each key
+export async function fetchChangesSince(since: string): Promise<Record<string, VersionedObject>> {
+  const manifest = await fetchDataManifest();
+  if (!manifest) return {};
+  const lists = await Promise.all(
+    manifest.changes
+      .filter((entry) => entry.date > since)
+      .map(async (entry) => {
+        const response = await fetch(`${BASE_URL}/${entry.key}`);
+        return response.ok ? ((await response.json()) as ChangeList) : null;
+      })
+  );
+  const changed: Record<string, VersionedObject> = {};
+  for (const list of lists) {
+    if (list) Object.assign(changed, list.objects);
+  }
+  return changed;
+}
 
 // Mock Data for development
 const MOCK_REPOS: Repo[] = [
@@ -40,13 +93,31 @@ const MOCK_REPOS: Repo[] = [
   }
 ];
 
+// Weekly/monthly aggregates published by the crawler (crawler/rollups.py)
+export async function fetchRollup(range: Exclude<TimeRange, 'daily'>, date: string): Promise<Rollup | null> {
+  try {
+    const response = await fetch(`${BASE_URL}/data/${range}/${date}.json`);
+    if (!response.ok) throw new Error("Failed to fetch rollup");
+    return await response.json();
+  } catch {
+    return null;
+  }
+}
+
 export async function fetchTrending(range: TimeRange): Promise<Repo[]> {
   try {
-    console.log(`Fetching trending for range: ${range}`); // Use variable
     const today = new Date().toISOString().split('T')[0];
+    if (range !== 'daily') {
+      const rollup = await fetchRollup(range, today);
+      if (rollup) return rollup.repos;
+    }
     const response = await fetch(`${BASE_URL}/data/daily/${today}.json`);
     if (!response.ok) throw new Error("Failed to fetch");
-    return await response.json();
+    const data: Repo[] = await response.json();
+    // The daily file merges all trending ranges; older files only hold daily entries
+    return data
+      .filter((repo) => (repo.ranges ?? ['daily']).includes(range))
+      .map((repo) => ({ ...repo, growth: repo.growth_by_range?.[range] ?? repo.growth }));
   } catch (e) {
     console.warn("Using mock data", e);
     return MOCK_REPOS;
@@ -57,15 +128,89 @@ export async function fetchRepoDetails(owner: string, repo: string): Promise<Rep
   try {
     const response = await fetch(`${BASE_URL}/data/projects/${owner}/${repo}.json`);
     if (!response.ok) throw new Error("Failed to fetch");
-    return await response.json();
+    const data: Repo = await response.json();
+    return { ...data, star_history: expandStarHistory(data.star_history) };
   } catch (e) {
     console.warn("Using mock data for details", e);
     return MOCK_REPOS.find(r => r.owner === owner && r.repo === repo) || MOCK_REPOS[0];
   }
 }
 
+// Full README, stored as a content-addressed blob (served gzip-encoded, decoded by the browser)
+export async function fetchReadme(repo: Repo): Promise<string> {
+  if (!repo.readme_ref) return repo.readme_excerpt ?? '';
+  try {
+    const response = await fetch(`${BASE_URL}/${repo.readme_ref}`);
+    if (!response.ok) throw new Error("Failed to fetch README");
+    return await response.text();
+  } catch {
+    return repo.readme_excerpt ?? '';
+  }
+}
+
+// Downsampled (LTTB) star history written by the crawler next to each project record
+export async function fetchStarHistory(owner: string, repo: string, points: 100 | 500 = 500): Promise<StarHistoryPoint[]> {
+  try {
+    const response = await fetch(`${BASE_URL}/data/history/${owner}/${repo}.json`);
+    if (!response.ok) throw new Error("Failed to fetch history");
+    const series: StarHistorySeries = await response.json();
+    return expandStarHistory(series.lttb[String(points)]);
+  } catch {
+    const details = await fetchRepoDetails(owner, repo);
+    return expandStarHistory(details?.star_history);
+  }
+}
+
+// Must match crawler/index.py:shard_for (FNV-1a 32-bit of the lowercased owner)
+export function shardForOwner(owner: string, shardCount: number): string {
+  let hash = 0x811c9dc5;
+  for (const byte of new TextEncoder().encode(owner.toLowerCase())) {
+    hash ^= byte;
+    hash = Math.imul(hash, 0x01000193) >>> 0;
+  }
+  return (hash % shardCount).toString(16).padStart(2, '0');
+}
+
+export async function fetchIndexManifest(): Promise<IndexManifest | null> {
+  try {
+    const response = await fetch(`${BASE_URL}/data/index/manifest.json`);
+    if (!response.ok) throw new Error("Failed to fetch index manifest");
+    return await response.json();
+  } catch {
+    return null;
+  }
+}
+
+export async function fetchIndexShards(manifest: IndexManifest, shardIds: string[]): Promise<Repo[]> {
+  const shards = await Promise.all(
+    shardIds
+      .filter((id) => manifest.shards[id])
+      // Unchanged shards (same hash) come from the local cache
+      .map((id) => fetchVersioned<Repo[]>(manifest.shards[id].key, manifest.shards[id].hash))
+  );
+  return shards.flat();
+}
+
+// Loads only the shards whose manifest entry lists the tag
+export async function fetchReposByTag(tag: string): Promise<Repo[]> {
+  try {
+    const manifest = await fetchIndexManifest();
+    if (!manifest) throw new Error("No index manifest");
+    const shardIds = Object.keys(manifest.shards).filter((id) => manifest.shards[id].tags[tag]);
+    const repos = await fetchIndexShards(manifest, shardIds);
+    return repos.filter((repo) => repo.tags.includes(tag));
+  } catch {
+    return MOCK_REPOS.filter((repo) => repo.tags.includes(tag));
+  }
+}
+
 export async function fetchAllRepos(): Promise<Repo[]> {
   try {
+    const manifest = await fetchIndexManifest();
+    if (manifest) {
+      return await fetchIndexShards(manifest, Object.keys(manifest.shards));
+    }
+    // Legacy single-file index
     const response = await fetch(`${BASE_URL}/data/index.json`);
     if (!response.ok) throw new Error("Failed to fetch index");
     return await response.json();
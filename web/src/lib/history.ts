@@ -0,0 +1,24 @@
+import type { CompactStarHistory, StarHistoryPoint } from '../types';
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+// Expands the crawler's compact star history (see crawler/history.py); legacy point lists pass through.
+export function expandStarHistory(value?: StarHistoryPoint[] | CompactStarHistory | null): StarHistoryPoint[] {
+  if (!value) return [];
+  if (Array.isArray(value)) return value;
+  if (!value.start || value.days.length === 0) return [];
+
+  const start = Date.parse(`${value.start}T00:00:00Z`);
+  const points: StarHistoryPoint[] = [];
+  let day = 0;
+  let count = 0;
+  value.days.forEach((dayDelta, i) => {
+    day += dayDelta;
+    count += value.counts[i];
+    points.push({
+      date: new Date(start + day * DAY_MS).toISOString().split('T')[0],
+      count,
+    });
+  });
+  return points;
+}
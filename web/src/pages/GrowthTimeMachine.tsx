@@ -1,12 +1,14 @@
 import React, { useState, useEffect } from 'react';
 import { StarHistoryChart } from '../components/StarHistoryChart';
-import { fetchTrending } from '../lib/api';
-import type { Repo } from '../types';
+import { fetchStarHistory, fetchTrending } from '../lib/api';
+import { expandStarHistory } from '../lib/history';
+import type { Repo, StarHistoryPoint } from '../types';
 import { Calendar } from 'lucide-react';
 
 export const GrowthTimeMachine: React.FC = () => {
   const [repos, setRepos] = useState<Repo[]>([]);
   const [selectedRepo, setSelectedRepo] = useState<Repo | null>(null);
+  const [fetchedHistory, setFetchedHistory] = useState<{ key: string; points: StarHistoryPoint[] } | null>(null);
 
   useEffect(() => {
     fetchTrending('daily').then(data => {
@@ -15,6 +17,24 @@ export const GrowthTimeMachine: React.FC = () => {
     });
   }, []);
 
+  // Daily entries carry no history; load the downsampled series for the selected repo
+  useEffect(() => {
+    if (!selectedRepo || selectedRepo.star_history) return;
+    let cancelled = false;
+    const key = `${selectedRepo.owner}/${selectedRepo.repo}`;
+    fetchStarHistory(selectedRepo.owner, selectedRepo.repo).then(points => {
+      if (!cancelled) setFetchedHistory({ key, points });
+    });
+    return () => {
+      cancelled = true;
+    };
+  }, [selectedRepo]);
+
+  const selectedKey = selectedRepo ? `${selectedRepo.owner}/${selectedRepo.repo}` : null;
+  const history = selectedRepo?.star_history
+    ? expandStarHistory(selectedRepo.star_history)
+    : fetchedHistory && fetchedHistory.key === selectedKey ? fetchedHistory.points : [];
+
   return (
     <div className="grid grid-cols-1 lg:grid-cols-3 gap-8">
       <div className="lg:col-span-2 space-y-6">
@@ -30,8 +50,8 @@ export const GrowthTimeMachine: React.FC = () => {
             </div>
           </div>
           
-          {selectedRepo && selectedRepo.star_history ? (
-            <StarHistoryChart data={selectedRepo.star_history} />
+          {selectedRepo && history.length > 0 ? (
+            <StarHistoryChart data={history} />
           ) : (
              <div className="h-64 flex items-center justify-center text-gray-400">
                No history data available
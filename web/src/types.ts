@@ -3,6 +3,18 @@ export interface StarHistoryPoint {
   count: number;
 }
 
+// Start date plus delta-encoded day offsets and counts
+export interface CompactStarHistory {
+  start: string | null;
+  days: number[];
+  counts: number[];
+}
+
+export interface StarHistorySeries {
+  points: number;
+  lttb: Record<string, CompactStarHistory>;
+}
+
 export interface Repo {
   owner: string;
   repo: string;
@@ -13,8 +25,76 @@ export interface Repo {
   growth: number;
   tags: string[];
   topics: string[];
-  star_history?: StarHistoryPoint[];
+  star_history?: StarHistoryPoint[] | CompactStarHistory;
   last_seen?: string;
+  refreshed?: string;
+  readme_ref?: string | null;
+  readme_excerpt?: string;
+  growth_per_day?: number;
+  ranges?: TimeRange[];
+  growth_by_range?: Partial<Record<TimeRange, number>>;
+}
+
+// Per-day figures kept in a rollup so the next day's rollup can drop expired days
+export interface RollupDay {
+  stars: number;
+  growth: number;
+  rank: number;
+}
+
+// Entry of data/weekly/<date>.json or data/monthly/<date>.json; growth is cumulative over the window
+export interface RollupEntry extends Repo {
+  days_on_trending: number;
+  rank: number;
+  best_rank: number;
+  previous_rank: number | null;
+  rank_change: number | null;
+  days: Record<string, RollupDay>;
+}
+
+export interface Rollup {
+  range: TimeRange;
+  window: number;
+  date: string;
+  start: string;
+  repos: RollupEntry[];
+}
+
+// An object's content hash and its versioned URL (<key>?v=<hash prefix>)
+export interface VersionedObject {
+  hash: string;
+  url: string;
+}
+
+// data/changes/<date>.json: every object written on that date
+export interface ChangeList {
+  date: string;
+  objects: Record<string, VersionedObject>;
+}
+
+// data/manifest.json
+export interface DataManifest {
+  version: number;
+  updated: string;
+  latest: Record<string, VersionedObject & { key: string }>;
+  changes: { date: string; key: string; count: number }[];
+}
+
+export interface IndexShard {
+  key: string;
+  count: number;
+  hash: string;
+  tags: Record<string, number>;
+  updated: string;
+}
+
+export interface IndexManifest {
+  version: number;
+  hash: string;
+  shard_count: number;
+  shards: Record<string, IndexShard>;
+  total: number;
+  updated: string;
 }
 
 export type TimeRange = 'daily' | 'weekly' | 'monthly';